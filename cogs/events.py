@@ -9,7 +9,7 @@ import logging
 import message_commands
 import music_commands
 import reminder_commands
-from music_commands import state as music_state
+from music_commands import sessions as music_sessions
 from music_commands.helpers import _cleanup_audio_file
 from shared.error_helpers import send_error_message
 
@@ -74,12 +74,18 @@ class EventsCog(commands.Cog):
     
     @commands.Cog.listener()
     async def on_disconnect(self):
-        """Handle bot disconnect event and cleanup state."""
-        music_state.reset()
-        try:
-            await _cleanup_audio_file(music_state.filename)
-        except Exception:
-            logger.exception("Error cleaning up audio file on disconnect")
+        """Handle bot disconnect event and cleanup state.
+
+        Queues are kept in their snapshots, so each guild's next music
+        command picks them up again.
+        """
+        for music_state in music_sessions:
+            filename = music_state.filename
+            music_sessions.suspend(music_state.guild_id)
+            try:
+                await _cleanup_audio_file(filename)
+            except Exception:
+                logger.exception("Error cleaning up audio file on disconnect")
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
@@ -6,6 +6,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+from typing import List
 
 import music_commands
 from shared.error_helpers import send_error_followup, check_voice_channel
@@ -32,6 +33,15 @@ class MusicCog(commands.Cog):
         """
         self.bot = bot
     
+    async def cog_load(self):
+        """Start warming the audio cache from play history."""
+        if BotConfig.MUSIC_WARMER_ENABLED:
+            music_commands.cache_warmer.start()
+    
+    async def cog_unload(self):
+        """Stop warming the audio cache."""
+        music_commands.cache_warmer.stop()
+    
     #region Commands
     
     @app_commands.command(name="play", description="Play a song")
@@ -52,20 +62,40 @@ class MusicCog(commands.Cog):
             logger.exception("Error playing song")
             await send_error_followup(interaction, "play the song")
     
+    @play.autocomplete("song")
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest songs the bot already resolved, without a YouTube search.
+
+        Args:
+            interaction: Discord interaction context.
+            current: Text typed so far.
+        """
+        return music_commands.suggest_songs(current)
+    
     @app_commands.command(name="queue", description="Add a song to the playlist")
     @app_commands.checks.cooldown(BotConfig.MUSIC_COOLDOWN_RATE, BotConfig.MUSIC_COOLDOWN_PER_SECONDS)
-    @app_commands.describe(song="Song name or YouTube URL")
+    @app_commands.describe(song="Song name, YouTube URL or YouTube playlist URL; separate several songs with ;")
     async def queue(self, interaction: discord.Interaction, song: str):
-        """Queue a song to the playlist.
+        """Queue a song, several songs or a whole YouTube playlist.
 
         Args:
             interaction: Discord interaction context.
-            song: Song name or YouTube URL.
+            song: Song name, YouTube URL or YouTube playlist URL, or several songs separated by ';'.
         """
         if not await check_voice_channel(interaction):
             return
         await music_commands.queue_song(interaction, song)
     
+    @queue.autocomplete("song")
+    async def queue_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest songs the bot already resolved, without a YouTube search.
+
+        Args:
+            interaction: Discord interaction context.
+            current: Text typed so far.
+        """
+        return music_commands.suggest_songs(current)
+    
     @app_commands.command(name="clear", description="Clear the playlist")
     async def clear(self, interaction: discord.Interaction):
         """Clear the music playlist.
@@ -84,6 +114,15 @@ class MusicCog(commands.Cog):
         """
         await music_commands.display_playlist(interaction)
     
+    @app_commands.command(name="quota", description="Show the YouTube API quota left today")
+    async def quota(self, interaction: discord.Interaction):
+        """Display the remaining YouTube API quota.
+
+        Args:
+            interaction: Discord interaction context.
+        """
+        await music_commands.display_quota(interaction)
+    
     @app_commands.command(name="pause", description="Pause the current song")
     async def pause(self, interaction: discord.Interaction):
         """Pause the current song.
@@ -142,6 +181,20 @@ class MusicCog(commands.Cog):
             return
         await music_commands.swap(interaction, index1, index2)
     
+    @app_commands.command(name="move", description="Move a song to another position in the playlist")
+    @app_commands.describe(index="Number of the song to move", position="New position of the song in the playlist")
+    async def move(self, interaction: discord.Interaction, index: int, position: int):
+        """Move a song to another position in the playlist.
+
+        Args:
+            interaction: Discord interaction context.
+            index: Song index to move.
+            position: New song index.
+        """
+        if not await check_voice_channel(interaction):
+            return
+        await music_commands.move(interaction, index, position)
+    
     @app_commands.command(name="remove", description="Remove a song from the playlist")
     @app_commands.describe(index="Number of the song to remove from the playlist")
     async def remove(self, interaction: discord.Interaction, index: int):
@@ -4,10 +4,22 @@
 
 from .commands import (
     play, queue_song, pause, resume, skip, stop, clear_playlist,
-    display_playlist, get_playlist_string, swap, remove, restart,
-    process_voice_state_update
+    display_playlist, get_playlist_string, swap, move, remove, restart,
+    process_voice_state_update, suggest_songs, display_quota
 )
-from .state import state, MusicState, reset_state
+from .state import sessions, get_state, MusicState, MusicStateRegistry, reset_state
+from .cache import audio_cache, AudioCache, DOWNLOAD_DIR
+from .search_cache import search_cache, SearchCache
+from .stream_cache import stream_cache, StreamCache, StreamInfo
+from .loudness import loudness_index, LoudnessIndex
+from .executors import WorkloadExecutor, executor_stats, current_guild
+from .sources import SourceProvider, LocalProvider, get_provider, set_provider
+from .queue import Track, TrackQueue
+from .snapshots import queue_snapshots, QueueSnapshotStore
+from .title_index import title_index, TitleIndex
+from .quota import youtube_quota, QuotaGovernor, QuotaExhaustedError
+from .history import play_history, PlayHistory
+from .warmer import cache_warmer, CacheWarmer
 
 #endregion
 
@@ -17,8 +29,19 @@ from .state import state, MusicState, reset_state
 __all__ = [
     'play', 'queue_song', 'pause', 'resume', 'skip', 'stop',
     'clear_playlist', 'display_playlist', 'get_playlist_string',
-    'swap', 'remove', 'restart', 'process_voice_state_update',
-    'state', 'MusicState', 'reset_state'
+    'swap', 'move', 'remove', 'restart', 'process_voice_state_update',
+    'suggest_songs', 'display_quota',
+    'sessions', 'get_state', 'MusicState', 'MusicStateRegistry', 'reset_state',
+    'audio_cache', 'AudioCache', 'DOWNLOAD_DIR', 'search_cache', 'SearchCache',
+    'stream_cache', 'StreamCache', 'StreamInfo',
+    'loudness_index', 'LoudnessIndex',
+    'WorkloadExecutor', 'executor_stats', 'current_guild',
+    'SourceProvider', 'LocalProvider', 'get_provider', 'set_provider',
+    'Track', 'TrackQueue',
+    'queue_snapshots', 'QueueSnapshotStore',
+    'title_index', 'TitleIndex',
+    'youtube_quota', 'QuotaGovernor', 'QuotaExhaustedError',
+    'play_history', 'PlayHistory', 'cache_warmer', 'CacheWarmer'
 ]
 
 #endregion
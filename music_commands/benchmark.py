@@ -0,0 +1,214 @@
+"""Music pipeline benchmark - Time-to-first-audio and queue throughput on the local source.
+
+Run from the project root:
+
+    python -m music_commands.benchmark --guilds 8 --songs 5 --latency 0.05
+
+Every guild queues its songs concurrently, then plays through them with
+prefetching, as handle_play does. Songs come from the local source provider,
+so no network access or API key is needed. Use --passes 2 to compare a cold
+run with one served from the caches, and --decode to also time the first
+audio frame out of FFmpeg.
+
+Unless MUSIC_DOWNLOAD_DIR is set, the benchmark re-runs itself with it
+pointing at a scratch directory that is deleted afterwards, so the audio
+cache and every other store of the bot are left untouched.
+"""
+
+#region Imports
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import asyncio
+import logging
+import argparse
+import statistics
+from typing import Dict, List, Optional
+from shared.config import BotConfig
+from .cache import DOWNLOAD_DIR, audio_cache
+from .stream_cache import stream_cache
+from .executors import current_guild, executor_stats
+from .queue import Track
+from .state import MusicState
+from .sources import LocalProvider, get_provider, set_provider
+from .helpers import create_audio_source, schedule_prefetch, take_prefetched
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Functions
+
+
+async def _queue_songs(state: MusicState, queries: List[str]) -> float:
+    """Resolve and queue songs the way a multi-song /queue does.
+
+    Args:
+        state: Guild music session
+        queries: Song queries
+
+    Returns:
+        Seconds taken
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(BotConfig.MUSIC_QUEUE_CONCURRENCY)
+
+    async def resolve(query: str) -> Optional[Dict]:
+        async with semaphore:
+            return await get_provider().search(query)
+
+    results = await asyncio.gather(*(resolve(query) for query in queries))
+    state.playlist.extend(Track.from_dict(entry) for entry in results if entry)
+    return time.perf_counter() - started
+
+
+async def _first_frame(prepared) -> None:
+    """Read the first audio frame of a prepared track through FFmpeg.
+
+    Args:
+        prepared: Prepared audio
+    """
+    source = await create_audio_source(prepared)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, source.read)
+    finally:
+        source.cleanup()
+
+
+async def _play_through(state: MusicState, decode: bool, play_seconds: float) -> List[float]:
+    """Play every queued track with prefetching, timing each start.
+
+    Args:
+        state: Guild music session
+        decode: Whether to wait for the first FFmpeg frame
+        play_seconds: Simulated playing time of each track
+
+    Returns:
+        Seconds from each track's turn to its audio being ready
+    """
+    timings = []
+    while state.playlist:
+        started = time.perf_counter()
+        track = state.playlist.popleft()
+        state.current_song = track
+        prepared = await take_prefetched(state, track.id)
+        try:
+            if decode:
+                await _first_frame(prepared)
+            timings.append(time.perf_counter() - started)
+            schedule_prefetch(state)
+            # Let the prefetch run while the track "plays"
+            await asyncio.sleep(play_seconds)
+        finally:
+            prepared.release()
+    state.current_song = None
+    state.cancel_prefetch()
+    return timings
+
+
+async def _run_guild(guild_id: int, run_id: str, songs: int, decode: bool, play_seconds: float) -> Dict[str, object]:
+    """Queue and play through a guild's songs.
+
+    Args:
+        guild_id: Simulated guild ID
+        run_id: Prefix keeping queries unique to this benchmark run
+        songs: Number of songs to queue
+        decode: Whether to wait for the first FFmpeg frame
+        play_seconds: Simulated playing time of each track
+
+    Returns:
+        Queue time and per-track start times of the guild
+    """
+    current_guild.set(guild_id)
+    state = MusicState(guild_id)
+    queries = [f"{run_id} guild {guild_id} song {index}" for index in range(songs)]
+    queue_seconds = await _queue_songs(state, queries)
+    starts = await _play_through(state, decode, play_seconds)
+    return {"queue_seconds": queue_seconds, "first": starts[0] if starts else None, "transitions": starts[1:]}
+
+
+def _summarize(values: List[float]) -> str:
+    """Format p50, p95 and max of a list of durations in milliseconds."""
+    if not values:
+        return "n/a"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return f"p50 {statistics.median(ordered) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms, max {ordered[-1] * 1000:.0f} ms"
+
+
+async def run_benchmark(guilds: int, songs: int, passes: int, decode: bool, play_seconds: float) -> None:
+    """Run the benchmark and print a report per pass.
+
+    Args:
+        guilds: Number of concurrent guilds
+        songs: Songs queued by each guild
+        passes: Number of runs over the same songs; later passes hit the caches
+        decode: Whether to wait for the first FFmpeg frame
+        play_seconds: Simulated playing time of each track
+    """
+    run_id = f"benchmark-{int(time.time())}"
+    for pass_number in range(1, passes + 1):
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_run_guild(guild_id, run_id, songs, decode, play_seconds) for guild_id in range(1, guilds + 1)))
+        elapsed = time.perf_counter() - started
+        queue_seconds = max(result["queue_seconds"] for result in results)
+        firsts = [result["first"] for result in results if result["first"] is not None]
+        transitions = [value for result in results for value in result["transitions"]]
+        print(f"Pass {pass_number}: {guilds} guilds x {songs} songs in {elapsed:.2f}s")
+        print(f"  queue throughput: {guilds * songs / queue_seconds:.1f} songs/s")
+        print(f"  time to first audio: {_summarize(firsts)}")
+        print(f"  track transitions: {_summarize(transitions)}")
+    print(f"Executors: {executor_stats()}")
+    print(f"Stream cache: {stream_cache.stats()}")
+    print(f"Audio cache: {audio_cache.stats()}")
+
+
+def main() -> None:
+    """Parse the command line and run the benchmark on the local source."""
+    parser = argparse.ArgumentParser(description="Benchmark the music pipeline offline.")
+    parser.add_argument("--guilds", type=int, default=4, help="concurrent guilds")
+    parser.add_argument("--songs", type=int, default=5, help="songs queued per guild")
+    parser.add_argument("--passes", type=int, default=1, help="runs over the same songs")
+    parser.add_argument("--latency", type=float, default=BotConfig.MUSIC_LOCAL_SOURCE_LATENCY_SECONDS,
+                        help="simulated latency of every source operation, in seconds")
+    parser.add_argument("--track-seconds", type=int, default=BotConfig.MUSIC_LOCAL_SOURCE_TRACK_SECONDS,
+                        help="length of the generated tracks")
+    parser.add_argument("--play-seconds", type=float, default=0.0,
+                        help="simulated playing time of each track, during which the next one is prefetched")
+    parser.add_argument("--decode", action="store_true", help="also wait for the first FFmpeg frame")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline logs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    if not os.getenv("MUSIC_DOWNLOAD_DIR"):
+        # The caches open their directory on import, so the scratch run needs a fresh interpreter
+        scratch_dir = tempfile.mkdtemp(prefix="music-benchmark-")
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-m", "music_commands.benchmark", *sys.argv[1:]],
+                env={**os.environ, "MUSIC_DOWNLOAD_DIR": scratch_dir},
+            )
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        sys.exit(completed.returncode)
+    provider = LocalProvider(os.path.join(DOWNLOAD_DIR, "local_source"), args.latency, args.track_seconds)
+    set_provider(provider)
+    try:
+        asyncio.run(run_benchmark(args.guilds, args.songs, args.passes, args.decode, args.play_seconds))
+    finally:
+        provider.close()
+
+
+if __name__ == "__main__":
+    main()
+
+#endregion
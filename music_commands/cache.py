@@ -0,0 +1,346 @@
+"""On-disk audio cache - Size-bounded LRU store of downloaded audio files."""
+
+#region Imports
+
+import os
+import json
+import atexit
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from shared.config import BotConfig
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+# Overridable so the benchmark can run against a scratch directory
+DOWNLOAD_DIR = os.path.abspath(
+    os.getenv("MUSIC_DOWNLOAD_DIR") or os.path.join(os.path.dirname(__file__), "..", "downloads")
+)
+os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+
+#endregion
+
+
+#region Cache Class
+
+
+class AudioCache:
+    """Size-bounded LRU cache of audio files keyed by video ID and stream itag.
+
+    The index is persisted as JSON next to the files so cached audio survives
+    restarts. Lookups only update recency in memory; it is written with the
+    next store or eviction, or by flush() on shutdown, so cache hits never
+    touch the disk. Files that are playing or about to play are pinned and never
+    evicted. The cache is shared by every guild and may be updated from
+    executor threads, so all access goes through a lock.
+
+    Attributes:
+        directory: Directory holding the cached files and the index.
+        max_bytes: Byte budget; least recently used unpinned files are evicted beyond it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, index_name: str = "cache_index.json"):
+        """Initialize the cache and load its persisted index.
+
+        Args:
+            directory: Directory holding the cached files and the index.
+            max_bytes: Byte budget for cached files.
+            index_name: File name of the persisted index.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(directory, index_name)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_video: Dict[str, set] = {}
+        self._keys_by_file: Dict[str, str] = {}
+        self._pins: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    @staticmethod
+    def make_key(video_id: str, itag: int) -> str:
+        """Build the cache key of a video stream.
+
+        Args:
+            video_id: YouTube video ID.
+            itag: YouTube stream itag.
+
+        Returns:
+            Cache key string.
+        """
+        return f"{video_id}:{itag}"
+
+    def file_path(self, video_id: str, itag: int, extension: str) -> str:
+        """Get the canonical path of a cached stream file.
+
+        Args:
+            video_id: YouTube video ID.
+            itag: YouTube stream itag.
+            extension: File extension without the dot.
+
+        Returns:
+            Absolute path inside the cache directory.
+        """
+        return os.path.join(self.directory, f"{video_id}_{itag}.{extension}")
+
+    def lookup(self, video_id: str) -> Optional[str]:
+        """Get the most recently used cached file of a video, whatever its itag.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            Absolute path of the cached file, or None on a miss.
+        """
+        with self._lock:
+            keys = self._keys_by_video.get(video_id)
+            if not keys:
+                return None
+            key = max(keys, key=lambda k: self._entries[k]["last_used"])
+            return self._hit_locked(key)
+
+    def contains(self, video_id: str) -> bool:
+        """Check whether any stream of a video is cached, without marking it as used.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            True if the cache holds a file of the video.
+        """
+        with self._lock:
+            return bool(self._keys_by_video.get(video_id))
+
+    def get(self, video_id: str, itag: int) -> Optional[str]:
+        """Get the cached file of a specific video stream.
+
+        Args:
+            video_id: YouTube video ID.
+            itag: YouTube stream itag.
+
+        Returns:
+            Absolute path of the cached file, or None on a miss.
+        """
+        with self._lock:
+            key = self.make_key(video_id, itag)
+            if key not in self._entries:
+                return None
+            return self._hit_locked(key)
+
+    def store(self, video_id: str, itag: int, file_path: str, codec: Optional[str] = None) -> str:
+        """Register a downloaded file and evict old files beyond the budget.
+
+        Args:
+            video_id: YouTube video ID.
+            itag: YouTube stream itag.
+            file_path: Path of the downloaded file inside the cache directory.
+            codec: Audio codec of the file (e.g. "opus"), if known.
+
+        Returns:
+            Absolute path of the cached file.
+        """
+        file_path = os.path.abspath(file_path)
+        size = os.path.getsize(file_path)
+        with self._lock:
+            key = self.make_key(video_id, itag)
+            if key in self._entries:
+                self._drop_locked(key, delete_file=False)
+            self._entries[key] = {
+                "video_id": video_id,
+                "itag": itag,
+                "file": os.path.basename(file_path),
+                "size": size,
+                "codec": codec,
+                "last_used": time.time(),
+            }
+            self._keys_by_video.setdefault(video_id, set()).add(key)
+            self._keys_by_file[os.path.basename(file_path)] = key
+            self._total_bytes += size
+            self._evict_locked()
+            self._save_locked()
+        return file_path
+
+    def flush(self) -> None:
+        """Write recency updates from lookups that are not saved yet."""
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+    def pin(self, file_path: str) -> None:
+        """Protect a cached file from eviction while it is in use.
+
+        Args:
+            file_path: Absolute path of the cached file.
+        """
+        with self._lock:
+            self._pins[file_path] = self._pins.get(file_path, 0) + 1
+
+    def unpin(self, file_path: Optional[str]) -> None:
+        """Release a pin taken with pin() and evict if over budget.
+
+        Args:
+            file_path: Absolute path of the cached file.
+        """
+        if not file_path:
+            return
+        with self._lock:
+            count = self._pins.get(file_path, 0) - 1
+            if count > 0:
+                self._pins[file_path] = count
+                return
+            self._pins.pop(file_path, None)
+            if self._evict_locked():
+                self._save_locked()
+
+    def owns(self, file_path: Optional[str]) -> bool:
+        """Check whether a file is managed by the cache.
+
+        Args:
+            file_path: Path to check.
+
+        Returns:
+            True if the file is a cached audio file.
+        """
+        return self._entry_of(file_path) is not None
+
+    def get_codec(self, file_path: Optional[str]) -> Optional[str]:
+        """Get the audio codec recorded for a cached file.
+
+        Args:
+            file_path: Absolute path of the cached file.
+
+        Returns:
+            Codec name such as "opus", or None if unknown.
+        """
+        entry = self._entry_of(file_path)
+        return entry.get("codec") if entry is not None else None
+
+    def _entry_of(self, file_path: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get the index entry of a cached file, if any."""
+        if not file_path:
+            return None
+        file_path = os.path.abspath(file_path)
+        if os.path.dirname(file_path) != self.directory:
+            return None
+        with self._lock:
+            key = self._keys_by_file.get(os.path.basename(file_path))
+            return self._entries.get(key) if key is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache usage figures.
+
+        Returns:
+            Dictionary with entry count, total bytes, budget and pinned file count.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "pinned": len(self._pins),
+            }
+
+    def _path_of(self, entry: Dict[str, Any]) -> str:
+        """Get the absolute path of an index entry."""
+        return os.path.join(self.directory, entry["file"])
+
+    def _hit_locked(self, key: str) -> Optional[str]:
+        """Mark an entry as used, dropping it if its file disappeared."""
+        entry = self._entries[key]
+        path = self._path_of(entry)
+        if not os.path.exists(path):
+            self._drop_locked(key, delete_file=False)
+            self._dirty = True
+            return None
+        entry["last_used"] = time.time()
+        self._entries.move_to_end(key)
+        self._dirty = True
+        return path
+
+    def _drop_locked(self, key: str, delete_file: bool) -> None:
+        """Remove an entry from the index and optionally delete its file."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry["size"]
+        self._keys_by_file.pop(entry["file"], None)
+        keys = self._keys_by_video.get(entry["video_id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_video[entry["video_id"]]
+        if delete_file:
+            try:
+                os.remove(self._path_of(entry))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Error deleting cached file %s: %s", entry["file"], e)
+
+    def _evict_locked(self) -> bool:
+        """Evict least recently used unpinned entries until within budget.
+
+        Returns:
+            True if any entry was evicted.
+        """
+        evicted = False
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._path_of(self._entries[key]) in self._pins:
+                continue
+            logger.info("Evicting cached audio %s", key)
+            self._drop_locked(key, delete_file=True)
+            evicted = True
+        return evicted
+
+    def _load(self) -> None:
+        """Load the persisted index, skipping entries whose file is gone."""
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as index_file:
+                entries = json.load(index_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("Audio cache index is unreadable, starting empty", exc_info=True)
+            return
+        for entry in sorted(entries, key=lambda e: e.get("last_used", 0)):
+            try:
+                path = self._path_of(entry)
+                if not os.path.exists(path):
+                    continue
+                key = self.make_key(entry["video_id"], entry["itag"])
+                entry["size"] = os.path.getsize(path)
+            except (KeyError, TypeError, OSError):
+                continue
+            self._entries[key] = entry
+            self._keys_by_video.setdefault(entry["video_id"], set()).add(key)
+            self._keys_by_file[entry["file"]] = key
+            self._total_bytes += entry["size"]
+        with self._lock:
+            if self._evict_locked():
+                self._save_locked()
+
+    def _save_locked(self) -> None:
+        """Atomically write the index to disk."""
+        temp_path = f"{self._index_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as index_file:
+                json.dump(list(self._entries.values()), index_file)
+            os.replace(temp_path, self._index_path)
+            self._dirty = False
+        except OSError:
+            logger.warning("Could not save the audio cache index", exc_info=True)
+
+
+# Global cache instance shared by every guild
+audio_cache = AudioCache(DOWNLOAD_DIR, BotConfig.AUDIO_CACHE_MAX_BYTES)
+atexit.register(audio_cache.flush)
+
+#endregion
@@ -3,18 +3,29 @@
 #region Imports
 
 import discord
+from discord import app_commands
+import time
 import asyncio
 import re
 import logging
-import os
-from typing import Optional
-import pytubefix as pytube
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
 from shared.config import BotConfig
 
-from .state import state
+from .state import MusicState, sessions, get_state
+from .executors import current_guild
+from .sources import get_provider
+from .queue import Track, format_duration
+from .title_index import title_index
+from .history import play_history
+from .quota import QuotaExhaustedError, youtube_quota
+from .views import PlaylistView, render_playlist_page
 from .helpers import (
-    get_youtube_song, get_video_title, _cleanup_audio_file,
-    _is_playing, _is_connected, _is_paused
+    iter_playlist_pages, metadata_resolver,
+    _cleanup_audio_file,
+    _is_playing, _is_connected, _is_paused, _channel_bitrate,
+    schedule_prefetch, retarget_prefetch, take_prefetched, create_audio_source,
+    PreparedAudio, broadcast_hub
 )
 from shared.error_helpers import send_error_followup, send_error_message
 
@@ -24,8 +35,14 @@ from shared.error_helpers import send_error_followup, send_error_message
 #region Setup
 
 logger = logging.getLogger(__name__)
-DOWNLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "downloads"))
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+
+_PLAYLIST_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtu.be")
+
+_INVALID_URL_MESSAGE = "Please enter a valid YouTube URL."
+_NOT_FOUND_MESSAGE = "Could not find a video with that name. Please try again."
+
+# Short failure reasons listed in the multi-song summary
+_SUMMARY_REASONS = {_INVALID_URL_MESSAGE: "invalid YouTube URL", _NOT_FOUND_MESSAGE: "no video found"}
 
 #endregion
 
@@ -42,6 +59,9 @@ async def queue_song(ctx: discord.Interaction, query: str, from_play: bool = Fal
         from_play: Whether called from play command
     """
     try:
+        state = get_state(ctx.guild.id)
+        # Blocking work started by this command is queued under this guild
+        current_guild.set(ctx.guild.id)
         # Defer response if not called from play command
         if not from_play:
             await ctx.response.defer()
@@ -53,41 +73,278 @@ async def queue_song(ctx: discord.Interaction, query: str, from_play: bool = Fal
                 await ctx.followup.send('Please enter a song name or YouTube URL.')
             return
         
-        # Check if the query is a YouTube link
-        if re.match(r'^https?:\/\/(?:www\.)?youtube\.com\/watch\?v=[\w-]+$', query):
-            video_id = query.split('=')[1]
-            # Retrieve the song title
-            video_title = await get_video_title(video_id)
-            playlist_entry = {"id": video_id, "title": video_title}
-        elif re.match(r'^https?:\/\/youtu\.be\/[\w-]+$', query):
-            video_id = query.split('/')[-1]
-            video_title = await get_video_title(video_id)
-            playlist_entry = {"id": video_id, "title": video_title}
-        elif query.strip().startswith("http"):
-            if from_play:
-                await ctx.channel.send("Please enter a valid YouTube URL.")
-            else:
-                await ctx.followup.send("Please enter a valid YouTube URL.")
-            return
+        queries = _split_queries(query)
+        # Import the whole playlist if the link points to one
+        playlist_id = _get_playlist_id(query)
+        if len(queries) > 1:
+            await _queue_many(ctx, state, queries, from_play)
+        elif playlist_id:
+            await _queue_playlist(ctx, state, playlist_id, from_play)
         else:
-            # Get the search query from the message content
-            result = await get_youtube_song(query)
-            # Get the first video from the search results
-            if result:
-                playlist_entry = result
-            else:
-                logger.info("No YouTube results found for query: %s", query)
-                await ctx.channel.send("Could not find a video with that name. Please try again.")
-                return
-        
-        state.playlist.append(playlist_entry)
-        if not from_play:
-            await ctx.followup.send(f"Song `{playlist_entry['title']}` added to the playlist.")
+            await _queue_single(ctx, state, query, from_play)
     except Exception as e:
         logger.exception("Error adding song to playlist")
         await send_error_followup(ctx, "add the song to the playlist")
         return
+    if not from_play:
+        try:
+            await _play_if_idle(ctx, state)
+        except Exception:
+            logger.exception("Error playing song")
+            await send_error_followup(ctx, "play the song")
+
+
+async def _queue_single(ctx: discord.Interaction, state: MusicState, query: str, from_play: bool) -> None:
+    """Add one song to the playlist by name or YouTube video link.
+    
+    Args:
+        ctx: Discord context
+        state: Music session of the guild
+        query: Song name or YouTube URL
+        from_play: Whether called from play command
+    """
+    playlist_entry, error_message = await _resolve_query(query)
+    if playlist_entry is None:
+        if from_play:
+            await ctx.channel.send(error_message)
+        else:
+            await ctx.followup.send(error_message)
+        return
     
+    track = Track.from_dict(playlist_entry)
+    state.playlist.append(track)
+    retarget_prefetch(state)
+    if not from_play:
+        await ctx.followup.send(f"Song `{track.title}` added to the playlist.")
+
+
+async def _play_if_idle(ctx: discord.Interaction, state: MusicState) -> None:
+    """Start the queue right away if the bot is idling in voice after the last song.
+    
+    Args:
+        ctx: Discord context
+        state: Music session of the guild
+    """
+    if state.idle_task is None or not state.playlist or state.loop_running:
+        return
+    if not _is_connected(state) or _is_playing(state) or _is_paused(state):
+        return
+    state.loop_running = True
+    try:
+        state.cancel_idle_disconnect()
+        state.last_play_channel = ctx.channel
+        await handle_play(ctx, state)
+    finally:
+        state.loop_running = False
+
+
+def _split_queries(query: str) -> List[str]:
+    """Split a /queue argument into the songs it lists.
+    
+    Args:
+        query: Song names or YouTube URLs separated by ';' or new lines
+        
+    Returns:
+        Non-empty queries, in order
+    """
+    return [part.strip() for part in re.split(r'[;\n]', query) if part.strip()]
+
+
+async def _resolve_query(query: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Resolve a song name or YouTube video link to a playlist entry.
+    
+    Args:
+        query: Song name or YouTube URL
+        
+    Returns:
+        The playlist entry and None, or None and a message explaining the failure
+    """
+    query = query.strip()
+    video_id = None
+    # Check if the query is a YouTube link
+    if re.match(r'^https?:\/\/(?:www\.)?youtube\.com\/watch\?v=[\w-]+$', query):
+        video_id = query.split('=')[1]
+    elif re.match(r'^https?:\/\/youtu\.be\/[\w-]+$', query):
+        video_id = query.split('/')[-1]
+    elif query.startswith("http"):
+        return None, _INVALID_URL_MESSAGE
+    if video_id is not None:
+        # Songs picked from autocomplete are already indexed with their metadata
+        result = title_index.get(video_id)
+        if result is None:
+            # Retrieve the song title, duration and thumbnail
+            result = await get_provider().get_metadata(video_id)
+            title_index.add(result)
+        return result, None
+    # Get the first video from the search results
+    result = await get_provider().search(query)
+    if not result:
+        logger.info("No YouTube results found for query: %s", query)
+        return None, _NOT_FOUND_MESSAGE
+    title_index.add(result)
+    return result, None
+
+
+def suggest_songs(current: str) -> List[app_commands.Choice[str]]:
+    """Suggest already resolved songs for the text typed in a song parameter.
+    
+    Only the last of several songs separated by ';' is completed. Each
+    choice's value is the text with that song replaced by its video link,
+    which is queued without a search.
+    
+    Args:
+        current: Text typed so far
+        
+    Returns:
+        Autocomplete choices, most played first
+    """
+    head, separator, tail = current.rpartition(";")
+    prefix = f"{head}{separator} " if separator else ""
+    choices = []
+    for entry in title_index.search(tail, BotConfig.MUSIC_AUTOCOMPLETE_RESULTS):
+        value = f"{prefix}https://www.youtube.com/watch?v={entry['id']}"
+        # Discord limits choice names and values to 100 characters
+        if len(value) > 100:
+            continue
+        duration = f" ({format_duration(entry['duration'])})"
+        title = entry['title']
+        if len(title) + len(duration) > 100:
+            title = title[:97 - len(duration)] + "..."
+        choices.append(app_commands.Choice(name=title + duration, value=value))
+    return choices
+
+
+async def _queue_many(ctx: discord.Interaction, state: MusicState, queries: List[str], from_play: bool) -> None:
+    """Add several songs to the playlist at once.
+    
+    Queries are resolved concurrently with bounded parallelism, then the
+    songs found are appended in the order they were given and a single
+    summary lists the ones that failed, and how many were skipped beyond
+    BotConfig.MUSIC_QUEUE_MAX_QUERIES.
+    
+    Args:
+        ctx: Discord context
+        state: Music session of the guild
+        queries: Song names or YouTube URLs
+        from_play: Whether called from play command
+    """
+    skipped = max(0, len(queries) - BotConfig.MUSIC_QUEUE_MAX_QUERIES)
+    queries = queries[:BotConfig.MUSIC_QUEUE_MAX_QUERIES]
+    semaphore = asyncio.Semaphore(BotConfig.MUSIC_QUEUE_CONCURRENCY)
+
+    async def resolve(query: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        if _get_playlist_id(query):
+            return None, "playlist links must be queued on their own"
+        async with semaphore:
+            try:
+                entry, error_message = await _resolve_query(query)
+            except Exception:
+                logger.exception("Error resolving query: %s", query)
+                return None, "could not be resolved"
+        if entry is None:
+            return None, _SUMMARY_REASONS[error_message]
+        return entry, None
+
+    results = await asyncio.gather(*(resolve(query) for query in queries))
+    tracks = [Track.from_dict(entry) for entry, _ in results if entry is not None]
+    state.playlist.extend(tracks)
+    if tracks:
+        retarget_prefetch(state)
+    lines = [f"{len(tracks)} of {len(queries)} songs added to the playlist."]
+    if skipped:
+        lines.append(f"{skipped} more songs were skipped: at most {BotConfig.MUSIC_QUEUE_MAX_QUERIES} can be queued at once.")
+    lines.extend(
+        f"- `{query}`: {error}" for query, (entry, error) in zip(queries, results) if entry is None
+    )
+    message = "\n".join(lines)[:2000]
+    if from_play:
+        await ctx.channel.send(message)
+    else:
+        await ctx.followup.send(message)
+
+
+def _get_playlist_id(query: str) -> Optional[str]:
+    """Extract the playlist ID from a YouTube URL with a list= parameter.
+    
+    Args:
+        query: Song name or YouTube URL
+        
+    Returns:
+        Playlist ID, or None if the query is not a playlist URL
+    """
+    url = urlparse(query.strip())
+    if url.scheme not in ("http", "https") or url.hostname not in _PLAYLIST_HOSTS:
+        return None
+    playlist_ids = parse_qs(url.query).get("list")
+    if not playlist_ids or not re.match(r'^[\w-]+$', playlist_ids[0]):
+        return None
+    return playlist_ids[0]
+
+
+async def _queue_playlist(ctx: discord.Interaction, state: MusicState, playlist_id: str, from_play: bool) -> None:
+    """Add the videos of a YouTube playlist to the playlist.
+    
+    Pages are fetched one after the other (each needs the previous page's
+    token) while the metadata of earlier pages is resolved concurrently.
+    Entries are appended in playlist order as soon as their page is ready.
+    
+    Args:
+        ctx: Discord context
+        state: Music session of the guild
+        playlist_id: YouTube playlist ID
+        from_play: Whether called from play command
+    """
+    semaphore = asyncio.Semaphore(BotConfig.YOUTUBE_PLAYLIST_CONCURRENCY)
+
+    async def resolve_page(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            metadata = await metadata_resolver.resolve_many(entry["id"] for entry in entries)
+        for entry in entries:
+            record = metadata.get(entry["id"])
+            if record:
+                entry.update((key, value) for key, value in record.items() if value is not None)
+        return entries
+
+    def append_entries(entries: List[Dict[str, Any]]) -> int:
+        for entry in entries:
+            title_index.add(entry)
+        state.playlist.extend(Track.from_dict(entry) for entry in entries)
+        retarget_prefetch(state)
+        return len(entries)
+
+    pending: List[asyncio.Task] = []
+    added = 0
+    try:
+        async for page in iter_playlist_pages(playlist_id, BotConfig.YOUTUBE_PLAYLIST_MAX_TRACKS):
+            pending.append(asyncio.create_task(resolve_page(page)))
+            while pending and pending[0].done():
+                added += append_entries(pending.pop(0).result())
+        while pending:
+            added += append_entries(await pending.pop(0))
+    except Exception as e:
+        for task in pending:
+            task.cancel()
+        if isinstance(e, QuotaExhaustedError):
+            logger.warning("YouTube API quota too low to import playlist %s", playlist_id)
+            reason = "the YouTube API quota is used up for today"
+        else:
+            logger.exception("Error importing playlist %s", playlist_id)
+            reason = None
+        if not added:
+            message = f"Could not load that playlist because {reason}." if reason else "Could not load that playlist. Please check the link and try again."
+        else:
+            message = f"Added {added} songs to the playlist before the rest of it could not be loaded."
+    else:
+        if not added:
+            message = "That playlist has no playable videos."
+        else:
+            message = f"{added} songs added to the playlist."
+    if from_play:
+        await ctx.channel.send(message)
+    else:
+        await ctx.followup.send(message)
+
+
 # Process a voice state update
 async def process_voice_state_update(
     member: discord.Member,
@@ -97,12 +354,15 @@ async def process_voice_state_update(
 ) -> None:
     """Handle voice state changes to detect disconnects and bot isolation."""
     try:
+        state = sessions.peek(member.guild.id)
+        if state is None:
+            return
         # Check if the member who triggered the update is the bot itself
         if member == client.user:
             # Check if the bot was connected to a voice channel before the update, but not after the update
             if before.channel is not None and after.channel is None:
                 # Get the channel where the "/play" command was last used in the guild
-                channel = state.last_play_channels.get(member.guild.id)
+                channel = state.last_play_channel
                 if channel is not None:
                     # Send a message to the channel
                     await channel.send(f"The bot has disconnected from voice channel `{before.channel.name}`")
@@ -128,67 +388,142 @@ async def process_voice_state_update(
         logger.exception("Error handling voice state update")
         
 # Play the next song in the playlist
-async def handle_play(ctx: discord.Interaction) -> None:
-    """Main playback loop - handles downloading, playing, and cleanup."""
+async def handle_play(ctx: discord.Interaction, state: MusicState) -> None:
+    """Main playback loop - handles downloading, playing, and cleanup.
+    
+    The loop sleeps on an event set by the voice client's ``after`` callback,
+    so it wakes exactly once per finished, skipped or stopped track and costs
+    nothing while a song plays or is paused. Once the playlist runs out, the
+    bot stays connected for BotConfig.MUSIC_IDLE_GRACE_SECONDS so the next
+    /play or /queue starts without a new voice handshake. Callers set
+    state.loop_running until it returns, so only one loop runs per guild.
+    
+    Args:
+        ctx: Discord context
+        state: Music session of the guild to play in
+    """
+    loop = asyncio.get_running_loop()
     while state.playlist:
-        # Get the voice channel the user is in
-        voice_channel = ctx.user.voice.channel
-        
-        # Connect to the voice channel
-        if not state.voice_client.is_connected():
-            state.voice_client = await voice_channel.connect()
-        # If the player is paused using the command /pause, I want this to wait until the /resume command is used
-        while state.voice_client.is_paused() and state.playlist:
-            await asyncio.sleep(1)
-        await asyncio.sleep(2)
-        state.current_song = state.playlist[0]
-        video = state.playlist.pop(0)
-        video_id = video["id"]
-        # Use pytube to download the audio from the YouTube video
-        loop = asyncio.get_event_loop()
-        
+        # Connect to the voice channel the user is in
+        if not _is_connected(state):
+            if ctx.user.voice is None:
+                break
+            state.voice_client = await ctx.user.voice.channel.connect()
+        video = state.playlist.popleft()
+        state.current_song = video
+        video_id = video.id
+        state.touch()
+        # Use the prefetched audio, or prepare it now if it is not ready
         try:
-            stream = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: pytube.YouTube(f"https://www.youtube.com/watch?v={video_id}")
-                    .streams.filter(only_audio=True)
-                    .first(),
-                ),
-                timeout=BotConfig.DOWNLOAD_TIMEOUT_SECONDS,
-            )
-            downloaded_path = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: stream.download(output_path=DOWNLOAD_DIR),
-                ),
-                timeout=BotConfig.DOWNLOAD_TIMEOUT_SECONDS,
-            )
-            state.filename = os.path.abspath(downloaded_path)
+            prepared = await take_prefetched(state, video_id)
+            state.filename = prepared.file_path
+            state.stream_url = prepared.location if prepared.streamed else None
         except asyncio.TimeoutError:
             await send_error_message(ctx.channel, "download the song in time")
             continue
         except Exception:
             await send_error_message(ctx.channel, "download the song")
             continue
-        await ctx.channel.send(f"▶️ Now playing `{state.current_song['title']}` in voice channel \"{state.voice_client.channel}\"")
-        audio = discord.FFmpegPCMAudio(state.filename)
-
-        # Play the audio
-        state.voice_client.play(audio)
-        # Wait for the audio to finish playing
-        while (state.voice_client is not None) and state.voice_client.is_playing():
-            await asyncio.sleep(1)
-        
-        # Clean up the file after playing (or skipping)
-        if not state.voice_client.is_paused():
-            await _cleanup_audio_file(state.filename)
+        if not _is_connected(state):
+            prepared.release()
+            break
+
+        try:
+            # Play the audio, pre-warmed by the prefetch when possible
+            state.restart_requested = False
+            finished = _play_source(loop, state, await _open_source(state, prepared))
+            title_index.record_play(video.to_dict())
+            play_history.record(state.guild_id, video_id, _channel_bitrate(state))
+            # Announce after playback started and prepare the next track while this one plays
+            await ctx.channel.send(f"▶️ Now playing `{state.current_song.title}` in voice channel \"{state.voice_client.channel}\"")
+            schedule_prefetch(state)
+            # Wait for the audio to finish playing, replaying it whenever /restart stops it
+            while True:
+                await finished.wait()
+                if not (state.restart_requested and _is_connected(state)):
+                    break
+                state.restart_requested = False
+                finished = _play_source(loop, state, await _open_source(state, prepared))
+        finally:
+            # Release the file after playing (or skipping) so the cache may evict it
+            prepared.release()
         
-    # Disconnect from the voice channel only when playlist is empty (after while loop ends)
+    state.current_song = None
+    state.cancel_prefetch()
+    # Disconnect from the voice channel once the playlist is empty, after the idle grace period
     if (state.voice_client is not None) and not state.voice_client.is_paused() and (state.voice_client.is_playing() == False and state.voice_client.is_connected()):
+        await _leave_when_idle(state)
+
+
+async def _leave_when_idle(state: MusicState) -> None:
+    """Disconnect from voice now, or after the idle grace period if one is configured.
+    
+    Args:
+        state: Music session of the guild
+    """
+    state.cancel_idle_disconnect()
+    if BotConfig.MUSIC_IDLE_GRACE_SECONDS > 0:
+        state.idle_task = asyncio.create_task(_disconnect_when_idle(state))
+    else:
         await state.voice_client.disconnect()
         state.voice_client = None
-        state.current_song = None
+
+
+async def _disconnect_when_idle(state: MusicState) -> None:
+    """Leave the voice channel if nothing started playing during the idle grace period.
+    
+    Args:
+        state: Music session of the guild
+    """
+    await asyncio.sleep(BotConfig.MUSIC_IDLE_GRACE_SECONDS)
+    state.idle_task = None
+    if _is_connected(state) and not _is_playing(state) and not _is_paused(state):
+        logger.info("Leaving voice in guild %s after the idle grace period", state.guild_id)
+        await state.voice_client.disconnect()
+        state.voice_client = None
+
+
+async def _open_source(state: MusicState, prepared: PreparedAudio) -> discord.AudioSource:
+    """Get the audio source of a prepared track.
+    
+    With shared broadcasts enabled, guilds playing the same track read one
+    decoder. Otherwise the source pre-warmed by the prefetch is used, so the
+    track starts without waiting on FFmpeg, or a new one is created.
+    
+    Args:
+        state: Music session of the guild to play in
+        prepared: Prepared audio of the track
+        
+    Returns:
+        Audio source ready to be played
+    """
+    if BotConfig.MUSIC_BROADCAST_ENABLED and prepared.video_id is not None:
+        return await broadcast_hub.attach(prepared, state.guild_id)
+    return prepared.take_source() or await create_audio_source(prepared)
+
+
+def _play_source(loop: asyncio.AbstractEventLoop, state: MusicState, audio: discord.AudioSource) -> asyncio.Event:
+    """Start playing an audio source and get an event set when it ends.
+    
+    Args:
+        loop: Event loop running the playback loop
+        state: Music session of the guild to play in
+        audio: Audio source to play
+        
+    Returns:
+        Event set once the source finishes, is skipped or is stopped
+    """
+    finished = asyncio.Event()
+
+    def _after(error: Optional[Exception]) -> None:
+        # Runs on the voice client's player thread
+        if error is not None:
+            logger.error("Playback error in guild %s: %s", state.guild_id, error)
+        loop.call_soon_threadsafe(finished.set)
+
+    state.voice_client.play(audio, after=_after)
+    state.song_started_at = time.monotonic()
+    return finished
 
 
 # Play a song
@@ -202,13 +537,22 @@ async def play(ctx: discord.Interaction, song: Optional[str]) -> None:
     # Defer the response immediately to prevent timeout
     await ctx.response.defer()
     
+    state = get_state(ctx.guild.id)
+    current_guild.set(ctx.guild.id)
     response_messages = []
+    # Claimed before any await so a second /play cannot start another playback loop
+    claimed = not (state.loop_running or _is_playing(state) or _is_paused(state) or state.current_song is not None)
+    if claimed:
+        state.loop_running = True
     try:
-        if state.voice_client and state.voice_client.is_connected():
-            if state.voice_client.is_paused():
+        # A song is playing, paused, or being searched or prepared for the playback loop
+        if not claimed:
+            if _is_paused(state):
                 response_messages.append(f"There is already a song that is paused in the voice channel \"{state.voice_client.channel}\". Please use the `/resume` command to resume the song or the `/queue` command to add it to the playlist. If you wish to stop the music and clear the playlist, use the `/stop` command.")
-            else:
+            elif _is_connected(state):
                 response_messages.append(f"I am already playing a song in the voice channel \"{state.voice_client.channel}\". Please use the `/stop` command to stop the current song or use the `/queue` command to add it to the playlist.")
+            else:
+                response_messages.append("A song is already being started. Please use the `/queue` command to add it to the playlist.")
         # Check if the user specified a song
         elif not state.playlist and not song:
             response_messages.append('The playlist is empty. Please specify a song to play.')
@@ -222,15 +566,19 @@ async def play(ctx: discord.Interaction, song: Optional[str]) -> None:
             state.voice_client = await ctx.user.voice.channel.connect()
             
         if not response_messages:  # If there are no error messages
+            # Keep the connection while the song is searched
+            state.cancel_idle_disconnect()
             if not state.playlist:
                 # Send status before searching
                 await ctx.followup.send("🎵 Searching for song... Please wait...")
                 await queue_song(ctx, song, True)
-            # Wait for queue_song to complete (playlist populated)
-            while not state.playlist:
-                await asyncio.sleep(1)
-            state.last_play_channels[ctx.guild.id] = ctx.channel
-            await handle_play(ctx)
+            # queue_song already reported why nothing was queued
+            if not state.playlist:
+                if _is_connected(state) and not _is_playing(state):
+                    await _leave_when_idle(state)
+                return
+            state.last_play_channel = ctx.channel
+            await handle_play(ctx, state)
         else:  # If there are error messages
             await ctx.followup.send("\n".join(response_messages))
     except Exception as e:
@@ -241,6 +589,9 @@ async def play(ctx: discord.Interaction, song: Optional[str]) -> None:
         await _cleanup_audio_file(state.filename)
         await send_error_followup(ctx, "play the song")
         return
+    finally:
+        if claimed:
+            state.loop_running = False
     
 # Clear the playlist
 async def clear_playlist(ctx: discord.Interaction) -> None:
@@ -250,7 +601,9 @@ async def clear_playlist(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
+        state = get_state(ctx.guild.id)
         state.playlist.clear()
+        retarget_prefetch(state)
         await ctx.response.send_message("Playlist cleared.")
     except Exception as e:
         logger.exception("Error clearing playlist")
@@ -265,29 +618,50 @@ async def display_playlist(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
+        state = get_state(ctx.guild.id)
         if not state.playlist:
             await ctx.response.send_message("The playlist is empty.")
             return
-        playlist_string = get_playlist_string()
-        await ctx.response.send_message(playlist_string)
+        view = PlaylistView(state)
+        await ctx.response.send_message(view.render(), view=view)
+        view.message = await ctx.original_response()
     except Exception as e:
         logger.exception("Error displaying playlist")
         await send_error_followup(ctx, "display the playlist")
         return
 
+# Display the remaining YouTube API quota
+async def display_quota(ctx: discord.Interaction) -> None:
+    """Show how much of the daily YouTube API quota is left.
+    
+    Args:
+        ctx: Discord context
+    """
+    try:
+        stats = youtube_quota.stats()
+        hours, seconds = divmod(stats["reset_seconds"], 3600)
+        searches = "Searches use the API." if stats["searches_allowed"] else "Searches are scraped for now."
+        await ctx.response.send_message(
+            f"YouTube API quota: {stats['remaining']} of {stats['limit']} units left today. "
+            f"{searches} Resets in {hours}h {seconds // 60:02d}m."
+        )
+    except Exception as e:
+        logger.exception("Error displaying the YouTube quota")
+        await send_error_followup(ctx, "display the YouTube quota")
+        return
+
 # Get the playlist as a string
-def get_playlist_string() -> str:
-    """Get the current playlist as a formatted string.
+def get_playlist_string(state: MusicState, page: int = 0) -> str:
+    """Get one page of the current playlist as a formatted string.
     
+    Args:
+        state: Music session of the guild
+        page: 0-based page number
+        
     Returns:
-        Formatted playlist string
+        Formatted playlist page that fits in a Discord message
     """
-    if not state.playlist:
-        return "Playlist is empty."
-    playlist_string = "New playlist:\n"
-    for i in range(len(state.playlist)):
-        playlist_string += f"{i+1}. {state.playlist[i]['title']}\n"
-    return playlist_string
+    return render_playlist_page(state.playlist, page)
     
 # Pause the current song
 async def pause(ctx: discord.Interaction) -> None:
@@ -297,10 +671,11 @@ async def pause(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
-        if not _is_playing():
+        state = get_state(ctx.guild.id)
+        if not _is_playing(state):
             await ctx.response.send_message("There is no song playing.")
             return
-        if _is_paused():
+        if _is_paused(state):
             await ctx.response.send_message("The song is already paused.")
             return
         state.voice_client.pause()
@@ -318,11 +693,12 @@ async def resume(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
-        if _is_paused():
+        state = get_state(ctx.guild.id)
+        if _is_paused(state):
             state.voice_client.resume()
             await ctx.response.send_message("Song resumed.")
             return
-        elif _is_playing():
+        elif _is_playing(state):
             await ctx.response.send_message("The song is not paused.")
             return
         else:
@@ -341,14 +717,14 @@ async def skip(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
-        if _is_playing():
+        state = get_state(ctx.guild.id)
+        if _is_playing(state):
             state.voice_client.stop()
             if state.playlist:
                 await ctx.response.send_message("Song skipped. Playing next song... Please wait...")
             else:
+                # The playback loop ends and the idle grace period starts
                 await ctx.response.send_message("Song skipped.")
-                if state.voice_client:
-                    await state.voice_client.disconnect()
             return
         else:
             await ctx.response.send_message("There is no song playing.")
@@ -366,14 +742,19 @@ async def stop(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
-        if not _is_connected():
+        state = get_state(ctx.guild.id)
+        if not _is_connected(state):
             await ctx.response.send_message("There is no song playing.")
             return
+        #clear the playlist first so the after callback finds nothing left to play
+        state.cancel_idle_disconnect()
+        state.cancel_prefetch()
+        if state.playlist:
+            state.playlist.clear()
+        state.current_song = None
         #stop the audio and disconnect from the voice channel
         state.voice_client.stop()
         await state.voice_client.disconnect()
-        if state.playlist:
-            state.playlist.clear()
         await ctx.response.send_message("Music stopped. The playlist has been cleared.")
     except Exception as e:
         logger.exception("Error stopping music")
@@ -389,6 +770,7 @@ async def swap(ctx: discord.Interaction, index1: int, index2: int) -> None:
         index2: Second song index (1-based)
     """
     try:
+        state = get_state(ctx.guild.id)
         if not state.playlist:
             await ctx.response.send_message("The playlist is empty.")
             return
@@ -398,12 +780,11 @@ async def swap(ctx: discord.Interaction, index1: int, index2: int) -> None:
             return
         index1 -= 1
         index2 -= 1
-        temp = state.playlist[index1]
-        state.playlist[index1] = state.playlist[index2]
-        state.playlist[index2] = temp
+        state.playlist.swap(index1, index2)
+        retarget_prefetch(state)
         
         # Combine the swap message with the new playlist
-        message = f"Swapped songs `{state.playlist[index1]['title']}` and `{state.playlist[index2]['title']}`.\n{get_playlist_string()}"
+        message = f"Swapped songs `{state.playlist[index1].title}` and `{state.playlist[index2].title}`.\n{get_playlist_string(state)}"
         await ctx.response.send_message(message)
     except Exception as e:
         logger.exception("Error swapping songs")
@@ -418,6 +799,7 @@ async def remove(ctx: discord.Interaction, index: int) -> None:
         index: Song index (1-based)
     """
     try:
+        state = get_state(ctx.guild.id)
         if not state.playlist:
             await ctx.response.send_message("The playlist is empty.")
             return
@@ -426,16 +808,45 @@ async def remove(ctx: discord.Interaction, index: int) -> None:
             await ctx.response.send_message("Please enter a valid song number from the playlist.")
             return
         index -= 1
-        removed_song = state.playlist.pop(index)
+        removed_song = state.playlist.remove(index)
+        retarget_prefetch(state)
         
         # Combine the removal message with the new playlist
-        message = f"Removed song `{removed_song['title']}` from the playlist.\n{get_playlist_string()}"
+        message = f"Removed song `{removed_song.title}` from the playlist.\n{get_playlist_string(state)}"
         await ctx.response.send_message(message)
     except Exception as e:
         logger.exception("Error removing song")
         await send_error_followup(ctx, "remove the song")
         return
     
+async def move(ctx: discord.Interaction, index: int, position: int) -> None:
+    """Move a song to another position in the playlist.
+    
+    Args:
+        ctx: Discord context
+        index: Current song index (1-based)
+        position: New song index (1-based)
+    """
+    try:
+        state = get_state(ctx.guild.id)
+        if not state.playlist:
+            await ctx.response.send_message("The playlist is empty.")
+            return
+
+        if index < 1 or index > len(state.playlist) or position < 1 or position > len(state.playlist):
+            await ctx.response.send_message("Please enter a valid song number from the playlist.")
+            return
+        state.playlist.move(index - 1, position - 1)
+        retarget_prefetch(state)
+        
+        # Combine the move message with the new playlist
+        message = f"Moved song `{state.playlist[position - 1].title}` to position {position}.\n{get_playlist_string(state)}"
+        await ctx.response.send_message(message)
+    except Exception as e:
+        logger.exception("Error moving song")
+        await send_error_followup(ctx, "move the song")
+        return
+    
 async def restart(ctx: discord.Interaction) -> None:
     """Restart the current song from the beginning.
     
@@ -443,18 +854,16 @@ async def restart(ctx: discord.Interaction) -> None:
         ctx: Discord context
     """
     try:
+        state = get_state(ctx.guild.id)
         if state.voice_client is None or not state.voice_client.is_playing() and not state.voice_client.is_paused():
             await ctx.response.send_message("There is no song playing.")
             return
         elif state.voice_client.is_paused():
             await ctx.response.send_message("The song is paused. Please use the `/resume` command to resume the song and then the `/restart` command to restart it.")
             return
+        # The playback loop replays the current song once the stop goes through
+        state.restart_requested = True
         state.voice_client.stop()
-        # Create a discord.FFmpegPCMAudio object to play the audio
-        audio = discord.FFmpegPCMAudio(f"{state.filename}")
-
-        # Play the audio
-        state.voice_client.play(audio)
         await ctx.response.send_message("Song restarting... Please wait...")
     except Exception as e:
         logger.exception("Error restarting song")
@@ -0,0 +1,152 @@
+"""Music executors - Bounded thread pools per workload class with per-guild fairness."""
+
+#region Imports
+
+import time
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from shared.config import BotConfig
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# Guild the running task works for; jobs submitted from it are queued under this guild
+current_guild: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_guild", default=None)
+
+#endregion
+
+
+#region Executor Class
+
+
+class WorkloadExecutor:
+    """Bounded thread pool for one class of blocking music work.
+
+    Jobs wait in one FIFO queue per guild and free workers take from the
+    guilds in round-robin order, so a guild importing a long playlist cannot
+    delay the other guilds' requests. Jobs cancelled while still queued are
+    dropped without running. Must be used from a single event loop.
+
+    Attributes:
+        name: Workload class name, used for thread names and metrics.
+        max_workers: Maximum number of jobs running at the same time.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """Initialize the executor.
+
+        Args:
+            name: Workload class name.
+            max_workers: Maximum number of jobs running at the same time.
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"music-{name}")
+        self._queues: "OrderedDict[Optional[int], Deque[Tuple[asyncio.Future, Callable[[], Any], float]]]" = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking function on the pool.
+
+        Args:
+            func: Function to call on a worker thread.
+            *args: Positional arguments for func.
+
+        Returns:
+            The return value of func.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        guild_id = current_guild.get()
+        self._queues.setdefault(guild_id, deque()).append((waiter, lambda: func(*args), time.monotonic()))
+        self._queued += 1
+        self._peak_queued = max(self._peak_queued, self._queued)
+        self._dispatch()
+        return await waiter
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue-depth and throughput figures.
+
+        Returns:
+            Dictionary with current queue depth and running jobs, peak queue
+            depth, completed and failed job counts and average queue wait.
+        """
+        started = self._completed + self._failed + self._running
+        return {
+            "queued": self._queued,
+            "running": self._running,
+            "max_workers": self.max_workers,
+            "peak_queued": self._peak_queued,
+            "completed": self._completed,
+            "failed": self._failed,
+            "avg_wait_seconds": self._total_wait_seconds / started if started else 0.0,
+        }
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while workers are free, one guild at a time."""
+        while self._running < self.max_workers and self._queues:
+            guild_id, queue = next(iter(self._queues.items()))
+            waiter, call, queued_at = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(guild_id)
+            else:
+                del self._queues[guild_id]
+            if waiter.done():
+                # Caller gave up while the job was queued
+                continue
+            self._running += 1
+            waited = time.monotonic() - queued_at
+            self._total_wait_seconds += waited
+            if waited >= 1.0:
+                logger.info("%s job waited %.1fs for a worker (%d still queued)", self.name, waited, self._queued)
+            loop = waiter.get_loop()
+            self._pool.submit(call).add_done_callback(
+                lambda future, waiter=waiter: loop.call_soon_threadsafe(self._finish, waiter, future)
+            )
+
+    def _finish(self, waiter: asyncio.Future, future: Future) -> None:
+        """Hand a finished job's outcome to its caller and start the next job."""
+        self._running -= 1
+        exception = future.exception()
+        if exception is None:
+            self._completed += 1
+            if not waiter.done():
+                waiter.set_result(future.result())
+        else:
+            self._failed += 1
+            if not waiter.done():
+                waiter.set_exception(exception)
+        self._dispatch()
+
+
+# YouTube Data API calls and title scrapes
+search_executor = WorkloadExecutor("search", BotConfig.MUSIC_SEARCH_WORKERS)
+# Stream resolution
+resolve_executor = WorkloadExecutor("resolve", BotConfig.MUSIC_RESOLVE_WORKERS)
+# Audio downloads
+download_executor = WorkloadExecutor("download", BotConfig.MUSIC_DOWNLOAD_WORKERS)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the metrics of every music executor.
+
+    Returns:
+        Mapping of workload class name to its stats.
+    """
+    return {executor.name: executor.stats() for executor in (search_executor, resolve_executor, download_executor)}
+
+#endregion
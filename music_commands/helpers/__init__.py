@@ -2,9 +2,18 @@
 
 #region Imports
 
-from .youtube import get_youtube_song, get_video_title
-from .voice import _is_playing, _is_connected, _is_paused
-from .audio import _cleanup_audio_file
+from .youtube import get_youtube_song, get_video_title, get_video_metadata, iter_playlist_pages
+from .metadata import metadata_resolver, MetadataResolver
+from .voice import _is_playing, _is_connected, _is_paused, _channel_bitrate
+from .audio import (
+    PreparedAudio, prepare_audio, download_audio, resolve_audio_stream, create_audio_source,
+    select_audio_stream, prewarm_audio_source,
+    _cleanup_audio_file
+)
+from .downloader import RangeNotSupportedError, download_segmented, download_sequential
+from .prebuffer import PrebufferedAudio
+from .broadcast import Broadcast, BroadcastReader, BroadcastHub, broadcast_hub
+from .prefetch import schedule_prefetch, retarget_prefetch, take_prefetched
 
 #endregion
 
@@ -12,9 +21,15 @@ from .audio import _cleanup_audio_file
 #region Exports
 
 __all__ = [
-    'get_youtube_song', 'get_video_title',
-    '_is_playing', '_is_connected', '_is_paused',
-    '_cleanup_audio_file'
+    'get_youtube_song', 'get_video_title', 'get_video_metadata', 'iter_playlist_pages',
+    'metadata_resolver', 'MetadataResolver',
+    '_is_playing', '_is_connected', '_is_paused', '_channel_bitrate',
+    'PreparedAudio', 'prepare_audio', 'download_audio', 'resolve_audio_stream', 'create_audio_source',
+    'select_audio_stream', 'prewarm_audio_source',
+    '_cleanup_audio_file',
+    'RangeNotSupportedError', 'download_segmented', 'download_sequential', 'PrebufferedAudio',
+    'Broadcast', 'BroadcastReader', 'BroadcastHub', 'broadcast_hub',
+    'schedule_prefetch', 'retarget_prefetch', 'take_prefetched'
 ]
 
 #endregion
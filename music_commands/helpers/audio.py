@@ -1,10 +1,23 @@
-"""Audio file handling and cleanup."""
+"""Audio file handling, downloading and cleanup."""
 
 #region Imports
 
 import os
 import asyncio
 import logging
+import re
+import uuid
+import urllib.error
+from typing import Iterable, Optional
+import discord
+from shared.config import BotConfig
+from ..cache import audio_cache, DOWNLOAD_DIR
+from ..loudness import loudness_index
+from ..executors import download_executor, resolve_executor
+from ..stream_cache import StreamInfo, stream_cache
+from ..sources import get_provider
+from .downloader import RangeNotSupportedError, download_segmented, download_sequential
+from .prebuffer import PrebufferedAudio
 
 #endregion
 
@@ -13,19 +26,397 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Let FFmpeg reconnect when a streamed HTTP connection drops mid-song
+FFMPEG_STREAM_BEFORE_OPTIONS = (
+    "-reconnect 1 -reconnect_streamed 1 -reconnect_on_network_error 1 "
+    f"-reconnect_delay_max {BotConfig.MUSIC_STREAM_RECONNECT_DELAY_MAX_SECONDS}"
+)
+
 #endregion
 
 
 #region Functions
 
 
+class PreparedAudio:
+    """Playable audio for a track: a cached file or a stream URL.
+    
+    Attributes:
+        location: Audio file path, or stream URL when streamed is True.
+        streamed: Whether location is a stream URL.
+        codec: Audio codec of the source (e.g. "opus"), or None if unknown.
+        video_id: YouTube video ID of the track, or None if unknown.
+        source: Pre-warmed audio source waiting to be played, if any.
+    """
+
+    __slots__ = ("location", "streamed", "codec", "video_id", "source")
+
+    def __init__(self, location: str, streamed: bool, codec: Optional[str] = None, video_id: Optional[str] = None):
+        """Initialize the prepared audio.
+        
+        Args:
+            location: Audio file path or stream URL
+            streamed: Whether location is a stream URL
+            codec: Audio codec of the source, if known
+            video_id: YouTube video ID of the track
+        """
+        self.location = location
+        self.streamed = streamed
+        self.codec = codec
+        self.video_id = video_id
+        self.source: Optional[discord.AudioSource] = None
+
+    @property
+    def file_path(self) -> Optional[str]:
+        """Audio file path, or None when streamed."""
+        return None if self.streamed else self.location
+
+    def take_source(self) -> Optional[discord.AudioSource]:
+        """Hand over the pre-warmed audio source, if there is one.
+        
+        Returns:
+            The source, now owned by the caller, or None
+        """
+        source, self.source = self.source, None
+        return source
+
+    def release(self) -> None:
+        """Stop an unplayed pre-warmed source and release the audio cache pin."""
+        source = self.take_source()
+        if source is not None:
+            source.cleanup()
+        audio_cache.unpin(self.file_path)
+
+
+async def prepare_audio(video_id: str, target_bitrate: Optional[int] = None) -> PreparedAudio:
+    """Get playable audio for a YouTube video.
+    
+    A cached file is used whenever there is one. Otherwise, in streaming mode
+    the resolved stream URL is returned so FFmpeg can read it directly. The
+    file download is used when streaming is disabled or the URL could not be
+    resolved. Returned files are pinned in the audio cache and must be
+    released with PreparedAudio.release() once played.
+    
+    Args:
+        video_id: YouTube video ID
+        target_bitrate: Bitrate of the voice channel in bits per second, if known
+        
+    Returns:
+        Prepared audio for the video
+    """
+    cached_path = _take_cached(video_id)
+    if cached_path is not None:
+        _schedule_loudness(video_id, cached_path)
+        return PreparedAudio(cached_path, False, audio_cache.get_codec(cached_path), video_id)
+    if BotConfig.MUSIC_STREAMING_ENABLED:
+        try:
+            stream = await resolve_audio_stream(video_id, target_bitrate)
+            return PreparedAudio(stream.url, True, stream.audio_codec, video_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Could not resolve stream URL for video %s, downloading instead", video_id, exc_info=True)
+    downloaded_path = await download_audio(video_id, target_bitrate)
+    _schedule_loudness(video_id, downloaded_path)
+    return PreparedAudio(downloaded_path, False, audio_cache.get_codec(downloaded_path), video_id)
+
+
+async def resolve_audio_stream(video_id: str, target_bitrate: Optional[int] = None) -> StreamInfo:
+    """Resolve the audio stream of a YouTube video.
+    
+    Args:
+        video_id: YouTube video ID
+        target_bitrate: Bitrate of the voice channel in bits per second, if known
+        
+    Returns:
+        Audio stream whose URL FFmpeg can read directly
+    """
+    return await asyncio.wait_for(
+        resolve_executor.run(_get_audio_stream, video_id, target_bitrate),
+        timeout=BotConfig.DOWNLOAD_TIMEOUT_SECONDS,
+    )
+
+
+async def create_audio_source(prepared: PreparedAudio, opus: bool = False) -> discord.AudioSource:
+    """Create the FFmpeg audio source for a prepared track.
+    
+    With Opus pass-through enabled, FFmpeg outputs Opus directly so
+    discord.py does not encode every frame itself. Opus sources are copied
+    without decoding, and other codecs are transcoded once inside FFmpeg.
+    Sources of unknown codec are probed first. When loudness normalization
+    is enabled and the track was analyzed, a static volume gain is applied
+    to audio FFmpeg decodes anyway. Copied Opus sources are played without
+    it, since applying it would mean re-encoding every frame.
+    
+    Args:
+        prepared: Prepared audio to play
+        opus: Output Opus even if Opus pass-through is disabled
+        
+    Returns:
+        Audio source ready to be played by a voice client
+    """
+    before_options = FFMPEG_STREAM_BEFORE_OPTIONS if prepared.streamed else None
+    gain = _get_loudness_gain(prepared.video_id)
+    options = f"-vn -af volume={gain:.2f}dB" if gain is not None else "-vn"
+    if not (BotConfig.MUSIC_OPUS_PASSTHROUGH or opus):
+        return discord.FFmpegPCMAudio(prepared.location, before_options=before_options, options=options)
+    codec = prepared.codec
+    if codec is None:
+        try:
+            codec, _ = await discord.FFmpegOpusAudio.probe(prepared.location)
+        except Exception:
+            logger.warning("Could not probe codec of %s, transcoding", prepared.location, exc_info=True)
+        prepared.codec = codec
+    copy = codec == "opus"
+    return discord.FFmpegOpusAudio(
+        prepared.location,
+        codec="copy" if copy else None,
+        before_options=before_options,
+        options="-vn" if copy else options,
+    )
+
+
+async def prewarm_audio_source(prepared: PreparedAudio) -> None:
+    """Start FFmpeg for a prepared track and buffer its first seconds ahead of its turn.
+    
+    The source is kept on the prepared audio until take_source() hands it
+    to the player, or release() stops it.
+    
+    Args:
+        prepared: Prepared audio of an upcoming track
+    """
+    if prepared.source is None:
+        source = await create_audio_source(prepared)
+        prepared.source = PrebufferedAudio(source, BotConfig.MUSIC_PREBUFFER_SECONDS)
+
+
+def _schedule_loudness(video_id: str, file_path: str) -> None:
+    """Queue a cached file for background loudness analysis, if enabled.
+    
+    Opus files are skipped under Opus pass-through: they are copied
+    without decoding, so no gain would be applied to them.
+    
+    Args:
+        video_id: YouTube video ID
+        file_path: Cached audio file of the video
+    """
+    if not BotConfig.MUSIC_LOUDNESS_NORMALIZATION:
+        return
+    if BotConfig.MUSIC_OPUS_PASSTHROUGH and audio_cache.get_codec(file_path) == "opus":
+        return
+    loudness_index.schedule(video_id, file_path)
+
+
+def _get_loudness_gain(video_id: Optional[str]) -> Optional[float]:
+    """Get the normalization gain of a video, if one should be applied.
+    
+    Gains too small to be noticed are skipped.
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Gain in dB, or None when no gain should be applied
+    """
+    if not BotConfig.MUSIC_LOUDNESS_NORMALIZATION or video_id is None:
+        return None
+    gain = loudness_index.get_gain(video_id)
+    if gain is None or abs(gain) < BotConfig.MUSIC_LOUDNESS_MIN_GAIN_DB:
+        return None
+    return gain
+
+
+def select_audio_stream(streams: Iterable, target_bitrate: Optional[int] = None):
+    """Pick the audio stream to play according to BotConfig.MUSIC_STREAM_SELECTION.
+    
+    Opus streams are preferred when Opus pass-through is enabled. With the
+    "smallest_above" policy, the lowest-bitrate stream at or above the target
+    is chosen, since the voice channel cannot carry more than its bitrate
+    anyway. When no stream reaches the target, the highest one is chosen.
+    
+    Args:
+        streams: Candidate audio streams
+        target_bitrate: Bitrate of the voice channel in bits per second, if known
+        
+    Returns:
+        Selected stream, or None if there are no candidates
+    """
+    candidates = list(streams)
+    if not candidates or BotConfig.MUSIC_STREAM_SELECTION == "first":
+        return candidates[0] if candidates else None
+    if BotConfig.MUSIC_OPUS_PASSTHROUGH:
+        opus_streams = [stream for stream in candidates if stream.audio_codec == "opus"]
+        candidates = opus_streams or candidates
+    highest = max(candidates, key=_stream_bitrate)
+    if BotConfig.MUSIC_STREAM_SELECTION == "highest" or target_bitrate is None:
+        return highest
+    target_bitrate = max(target_bitrate, BotConfig.MUSIC_STREAM_MIN_BITRATE)
+    sufficient = [stream for stream in candidates if _stream_bitrate(stream) >= target_bitrate]
+    return min(sufficient, key=_stream_bitrate) if sufficient else highest
+
+
+def _stream_bitrate(stream) -> int:
+    """Get the audio bitrate of a stream in bits per second.
+    
+    Args:
+        stream: Audio stream
+        
+    Returns:
+        Bitrate, or 0 if unknown
+    """
+    match = re.match(r'^(\d+)kbps$', getattr(stream, "abr", None) or "")
+    return int(match.group(1)) * 1000 if match else 0
+
+
+def _get_audio_stream(video_id: str, target_bitrate: Optional[int] = None) -> StreamInfo:
+    """Get the audio-only stream of a YouTube video that best fits the voice channel.
+    
+    Streams resolved earlier are reused until their URLs expire, so replays
+    skip the watch page fetch and signature deciphering.
+    
+    Args:
+        video_id: YouTube video ID
+        target_bitrate: Bitrate of the voice channel in bits per second, if known
+        
+    Returns:
+        Selected audio stream
+    """
+    streams = stream_cache.get(video_id)
+    if streams is None:
+        streams = get_provider().resolve_streams(video_id)
+        stream_cache.put(video_id, streams)
+    stream = select_audio_stream(streams, target_bitrate)
+    if stream is None:
+        raise ValueError(f"No audio stream found for video {video_id}")
+    logger.info(
+        "Selected itag %s (%s, %s, %s bytes) for video %s, channel bitrate %s",
+        stream.itag, stream.audio_codec, stream.abr, stream.filesize, video_id, target_bitrate,
+    )
+    return stream
+
+
+async def download_audio(video_id: str, target_bitrate: Optional[int] = None) -> str:
+    """Download the audio stream of a YouTube video through the audio cache.
+    
+    Repeat plays are served from the cache without touching the network. A
+    download the caller gave up on (cancel or timeout) still lands in the
+    cache once its thread finishes, so the work is not wasted. A cached
+    stream URL rejected with HTTP 403 is dropped and resolved again once.
+    
+    Args:
+        video_id: YouTube video ID
+        target_bitrate: Bitrate of the voice channel in bits per second, if known
+        
+    Returns:
+        Absolute path to the audio file, pinned in the audio cache
+    """
+    cached_path = _take_cached(video_id)
+    if cached_path is not None:
+        return cached_path
+    for attempt in range(2):
+        stream = await resolve_audio_stream(video_id, target_bitrate)
+        downloaded_path = audio_cache.get(video_id, stream.itag)
+        if downloaded_path is not None:
+            break
+        try:
+            downloaded_path = await asyncio.wait_for(
+                download_executor.run(_download_stream, video_id, stream),
+                timeout=BotConfig.DOWNLOAD_TIMEOUT_SECONDS,
+            )
+            break
+        except urllib.error.HTTPError as e:
+            if e.code != 403 or attempt > 0:
+                raise
+            logger.info("Stream URL of video %s was rejected, resolving it again", video_id)
+            stream_cache.invalidate(video_id)
+    audio_cache.pin(downloaded_path)
+    return downloaded_path
+
+
+def _take_cached(video_id: str) -> Optional[str]:
+    """Get and pin the cached audio file of a video.
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Absolute path of the pinned cached file, or None on a miss
+    """
+    cached_path = audio_cache.lookup(video_id)
+    if cached_path is not None:
+        audio_cache.pin(cached_path)
+        logger.info("Audio cache hit for video %s", video_id)
+    return cached_path
+
+
+def _download_stream(video_id: str, stream: StreamInfo) -> str:
+    """Download a stream into the audio cache.
+    
+    The file is written under a unique temporary name and renamed into place,
+    so concurrent downloads of the same stream never write the same file.
+    
+    Args:
+        video_id: YouTube video ID
+        stream: Audio stream to download
+        
+    Returns:
+        Absolute path of the cached file
+    """
+    final_path = audio_cache.file_path(video_id, stream.itag, stream.subtype)
+    temp_path = _fetch_stream(stream, f".part-{uuid.uuid4().hex}-")
+    try:
+        os.replace(temp_path, final_path)
+    except OSError:
+        # Another download already put the file in place and it is in use
+        os.remove(temp_path)
+        if not os.path.exists(final_path):
+            raise
+    return audio_cache.store(video_id, stream.itag, final_path, stream.audio_codec)
+
+
+def _fetch_stream(stream: StreamInfo, prefix: str) -> str:
+    """Download a stream to a temporary file in the download directory.
+    
+    Streams of known size are fetched in parallel segments, others in a
+    single request, as are streams whose server ignores byte ranges.
+    
+    Args:
+        stream: Audio stream to download
+        prefix: Unique file name prefix for the temporary file
+        
+    Returns:
+        Absolute path of the downloaded file
+    """
+    temp_path = os.path.join(DOWNLOAD_DIR, f"{prefix}{stream.itag}.{stream.subtype}")
+    try:
+        if stream.filesize:
+            try:
+                download_segmented(stream.url, temp_path, stream.filesize)
+            except RangeNotSupportedError:
+                logger.info("Server of itag %s ignores byte ranges, downloading in one request", stream.itag)
+                download_sequential(stream.url, temp_path)
+        else:
+            download_sequential(stream.url, temp_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return temp_path
+
+
 async def _cleanup_audio_file(file_path):
     """Clean up audio file with error handling.
     
+    Files kept by the audio cache are left in place for later plays.
+    
     Args:
         file_path: Path to the audio file to delete
     """
     try:
+        if audio_cache.owns(file_path):
+            return
         if file_path and os.path.exists(file_path):
             await asyncio.sleep(1)
             os.remove(file_path)
@@ -0,0 +1,292 @@
+"""Shared broadcasts - One Opus decoder per track, read by every guild playing it."""
+
+#region Imports
+
+import logging
+import threading
+from typing import Dict, List, Optional
+import discord
+from shared.config import BotConfig
+from ..cache import audio_cache
+from .audio import PreparedAudio, create_audio_source
+from .prebuffer import FRAMES_PER_SECOND
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# Frames the decoder stays ahead of the furthest listener
+_READ_AHEAD_FRAMES = FRAMES_PER_SECOND
+
+#endregion
+
+
+#region Broadcast Classes
+
+
+class Broadcast:
+    """One FFmpeg Opus decoder writing a track into a ring buffer shared by several listeners.
+
+    The decoder stays a short read-ahead in front of the furthest listener,
+    so the ring holds what was already played rather than audio nobody
+    reached yet. New listeners may join while the first frame of the track
+    is still in the ring, i.e. until the leading guild has played about a
+    ring's worth of audio, and hear it from the start. Listeners that play
+    in real time keep their distance behind the leader; one that stalls (a
+    paused guild) skips ahead to the oldest buffered frame when it resumes.
+
+    Attributes:
+        key: Video ID of the broadcast track.
+        capacity: Number of frames the ring buffer holds.
+    """
+
+    def __init__(self, key: str, source: discord.AudioSource, capacity: int, file_path: Optional[str] = None):
+        """Start decoding a track.
+
+        Args:
+            key: Video ID of the track
+            source: Opus audio source of the track, owned by the broadcast from now on
+            capacity: Number of frames the ring buffer holds
+            file_path: Cached file being read, pinned until the broadcast ends
+        """
+        self.key = key
+        self.capacity = capacity
+        self._source = source
+        self._file_path = file_path
+        self._frames: List[Optional[bytes]] = [None] * capacity
+        self._written = 0
+        self._ended = False
+        self._closed = False
+        self._decoder_waiting = False
+        self._readers: List["BroadcastReader"] = []
+        self._condition = threading.Condition()
+        if file_path is not None:
+            audio_cache.pin(file_path)
+        self._thread = threading.Thread(target=self._decode, name=f"broadcast-{key}", daemon=True)
+        self._thread.start()
+
+    @property
+    def listeners(self) -> int:
+        """Number of attached listeners."""
+        with self._condition:
+            return len(self._readers)
+
+    def join(self, guild_id: Optional[int] = None) -> Optional["BroadcastReader"]:
+        """Attach a new listener, starting at the first frame of the track.
+
+        Args:
+            guild_id: Guild of the listener, for logging
+
+        Returns:
+            The listener's audio source, or None if the broadcast is closed
+            or the start of the track has left the ring buffer
+        """
+        with self._condition:
+            if self._closed or self._written > self.capacity:
+                return None
+            reader = BroadcastReader(self, guild_id)
+            self._readers.append(reader)
+            return reader
+
+    def _read(self, reader: "BroadcastReader") -> bytes:
+        """Get a listener's next frame, waiting for the decoder if needed.
+
+        Args:
+            reader: Listener reading
+
+        Returns:
+            The next Opus frame, or b"" at the end of the track
+        """
+        with self._condition:
+            while True:
+                oldest = self._written - self.capacity
+                if reader.offset < oldest:
+                    logger.info("Listener in guild %s fell behind broadcast %s, skipping %d frames",
+                                reader.guild_id, self.key, oldest - reader.offset)
+                    reader.offset = oldest
+                if reader.offset < self._written:
+                    frame = self._frames[reader.offset % self.capacity]
+                    reader.offset += 1
+                    if self._decoder_waiting and self._written < self._limit():
+                        self._condition.notify_all()
+                    return frame
+                if self._ended or reader.detached:
+                    return b""
+                self._condition.wait()
+
+    def _detach(self, reader: "BroadcastReader") -> None:
+        """Remove a listener, stopping the decoder after the last one leaves.
+
+        Args:
+            reader: Listener leaving
+        """
+        with self._condition:
+            if reader in self._readers:
+                self._readers.remove(reader)
+            reader.detached = True
+            self._condition.notify_all()
+            if self._readers:
+                return
+            self._closed = True
+        broadcast_hub._remove(self)
+        # Ends a read blocked on FFmpeg's output
+        self._source.cleanup()
+
+    def _limit(self) -> int:
+        """Get the frame index the decoder may not write past. Called with the lock held."""
+        furthest = max((reader.offset for reader in self._readers), default=0)
+        return furthest + min(_READ_AHEAD_FRAMES, self.capacity)
+
+    def _decode(self) -> None:
+        """Decode the track into the ring buffer until it ends or every listener leaves."""
+        try:
+            while True:
+                with self._condition:
+                    while not self._closed and self._written >= self._limit():
+                        # Woken by the furthest listener's reads or by the last one leaving
+                        self._decoder_waiting = True
+                        self._condition.wait()
+                    self._decoder_waiting = False
+                    if self._closed:
+                        return
+                frame = self._source.read()
+                if not frame:
+                    return
+                with self._condition:
+                    self._frames[self._written % self.capacity] = frame
+                    self._written += 1
+                    self._condition.notify_all()
+        except Exception:
+            if not self._closed:
+                logger.exception("Error decoding broadcast %s", self.key)
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+            audio_cache.unpin(self._file_path)
+            self._file_path = None
+
+
+class BroadcastReader(discord.AudioSource):
+    """One guild's audio source reading a shared broadcast at its own offset.
+
+    Attributes:
+        broadcast: Broadcast being read.
+        guild_id: Guild of the listener, for logging.
+        offset: Index of the next frame to read.
+        detached: Whether cleanup was called.
+    """
+
+    def __init__(self, broadcast: Broadcast, guild_id: Optional[int]):
+        """Initialize a listener at the start of the track.
+
+        Args:
+            broadcast: Broadcast to read
+            guild_id: Guild of the listener, for logging
+        """
+        self.broadcast = broadcast
+        self.guild_id = guild_id
+        self.offset = 0
+        self.detached = False
+
+    def read(self) -> bytes:
+        """Get the next Opus frame of the broadcast.
+
+        Returns:
+            The next 20 ms Opus packet, or b"" at the end of the track
+        """
+        return self.broadcast._read(self)
+
+    def is_opus(self) -> bool:
+        """Broadcast frames are already Opus encoded."""
+        return True
+
+    def cleanup(self) -> None:
+        """Leave the broadcast."""
+        if not self.detached:
+            self.broadcast._detach(self)
+
+
+class BroadcastHub:
+    """Registry of running broadcasts, so guilds playing the same track share one decoder.
+
+    Attributes:
+        buffer_seconds: Audio each broadcast keeps after playing it, for listeners joining late.
+    """
+
+    def __init__(self, buffer_seconds: float):
+        """Initialize an empty hub.
+
+        Args:
+            buffer_seconds: Audio each broadcast keeps after playing it, for listeners joining late
+        """
+        self.buffer_seconds = buffer_seconds
+        self._broadcasts: Dict[str, Broadcast] = {}
+        self._lock = threading.Lock()
+        self._started = 0
+        self._joined = 0
+
+    async def attach(self, prepared: PreparedAudio, guild_id: Optional[int] = None) -> discord.AudioSource:
+        """Get a guild's audio source for a track, joining its broadcast if one can be joined.
+
+        Args:
+            prepared: Prepared audio of the track
+            guild_id: Guild that will play the source
+
+        Returns:
+            A listener of the track's broadcast
+        """
+        key = prepared.video_id
+        with self._lock:
+            broadcast = self._broadcasts.get(key)
+        reader = broadcast.join(guild_id) if broadcast is not None else None
+        if reader is not None:
+            self._joined += 1
+            logger.info("Guild %s joined broadcast %s (%d listeners)", guild_id, key, broadcast.listeners)
+            return reader
+        source = await create_audio_source(prepared, opus=True)
+        capacity = max(2 * _READ_AHEAD_FRAMES, int(self.buffer_seconds * FRAMES_PER_SECOND))
+        broadcast = Broadcast(key, source, capacity, prepared.file_path)
+        with self._lock:
+            # A broadcast that can no longer be joined stays running for its listeners
+            self._broadcasts[key] = broadcast
+        self._started += 1
+        logger.info("Guild %s started broadcast %s", guild_id, key)
+        return broadcast.join(guild_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Get broadcast usage figures.
+
+        Returns:
+            Running broadcasts, their listeners, and broadcasts started and joined
+        """
+        with self._lock:
+            broadcasts = list(self._broadcasts.values())
+        return {
+            "broadcasts": len(broadcasts),
+            "listeners": sum(broadcast.listeners for broadcast in broadcasts),
+            "started": self._started,
+            "joined": self._joined,
+        }
+
+    def _remove(self, broadcast: Broadcast) -> None:
+        """Forget a broadcast whose last listener left.
+
+        Args:
+            broadcast: Broadcast that closed
+        """
+        with self._lock:
+            if self._broadcasts.get(broadcast.key) is broadcast:
+                del self._broadcasts[broadcast.key]
+
+#endregion
+
+
+#region Global Hub
+
+broadcast_hub = BroadcastHub(BotConfig.MUSIC_BROADCAST_BUFFER_SECONDS)
+
+#endregion
@@ -0,0 +1,188 @@
+"""Parallel segmented downloader for audio streams, with a sequential fallback."""
+
+#region Imports
+
+import os
+import time
+import logging
+import threading
+import http.client
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+from shared.config import BotConfig
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en"}
+
+_READ_CHUNK_BYTES = 64 * 1024
+
+#endregion
+
+
+#region Exceptions
+
+
+class RangeNotSupportedError(Exception):
+    """Raised when the server answers a byte-range request with the whole file."""
+
+#endregion
+
+
+#region Functions
+
+
+def download_segmented(url: str, file_path: str, total_size: int) -> float:
+    """Download a URL into a file over several concurrent byte-range requests.
+
+    The file is preallocated and each segment is written at its own offset,
+    so segments can complete in any order. A segment that fails part way is
+    resumed from the last byte written, with a few retries. Once a segment
+    fails for good, the others stop at their next chunk. Small ranges also
+    avoid the per-connection throttling YouTube applies to long downloads.
+
+    Args:
+        url: Direct media URL that honours Range requests
+        file_path: Destination file, created or truncated
+        total_size: Size of the media in bytes
+
+    Returns:
+        Average throughput in bytes per second
+
+    Raises:
+        OSError: If a segment still fails after its retries
+        RangeNotSupportedError: If the server ignores Range requests
+    """
+    segment_bytes = BotConfig.MUSIC_DOWNLOAD_SEGMENT_BYTES
+    segments = [
+        (start, min(start + segment_bytes, total_size) - 1)
+        for start in range(0, total_size, segment_bytes)
+    ]
+    started = time.monotonic()
+    fd = os.open(file_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        os.ftruncate(fd, total_size)
+        write_lock = threading.Lock()
+        failed = threading.Event()
+        workers = min(BotConfig.MUSIC_DOWNLOAD_CONNECTIONS, len(segments)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment") as pool:
+            futures = [pool.submit(_download_segment, url, fd, segment, write_lock, failed) for segment in segments]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Drops segments not started yet; running ones see the event and stop
+                failed.set()
+                pool.shutdown(cancel_futures=True)
+                raise
+    finally:
+        os.close(fd)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    throughput = total_size / elapsed
+    logger.info(
+        "Downloaded %d bytes in %d segments over %d connections in %.1fs (%.2f MB/s)",
+        total_size, len(segments), workers, elapsed, throughput / 1_000_000,
+    )
+    return throughput
+
+
+def download_sequential(url: str, file_path: str) -> float:
+    """Download a URL into a file over a single request.
+
+    Used when the size of the media is unknown, so it cannot be split into
+    byte ranges. Nothing is resumed; a failure leaves a partial file.
+
+    Args:
+        url: Direct media URL
+        file_path: Destination file, created or truncated
+
+    Returns:
+        Average throughput in bytes per second
+    """
+    started = time.monotonic()
+    total_size = 0
+    request = urllib.request.Request(url, headers=_HEADERS)
+    with urllib.request.urlopen(request, timeout=BotConfig.MUSIC_DOWNLOAD_SEGMENT_TIMEOUT_SECONDS) as response:
+        with open(file_path, 'wb') as media_file:
+            while True:
+                chunk = response.read(_READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                media_file.write(chunk)
+                total_size += len(chunk)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    throughput = total_size / elapsed
+    logger.info("Downloaded %d bytes of unknown size in %.1fs (%.2f MB/s)", total_size, elapsed, throughput / 1_000_000)
+    return throughput
+
+
+def _download_segment(url: str, fd: int, segment: Tuple[int, int], write_lock: threading.Lock, failed: threading.Event) -> None:
+    """Fetch one byte range into the file, resuming after transient failures.
+
+    Args:
+        url: Direct media URL
+        fd: Open file descriptor of the preallocated destination
+        segment: Inclusive (first byte, last byte) range
+        write_lock: Serializes seek-and-write when os.pwrite is unavailable
+        failed: Set once another segment failed, to give up on this one
+    """
+    position, end = segment
+    attempts = 0
+    while position <= end and not failed.is_set():
+        request = urllib.request.Request(url, headers={**_HEADERS, "Range": f"bytes={position}-{end}"})
+        try:
+            with urllib.request.urlopen(request, timeout=BotConfig.MUSIC_DOWNLOAD_SEGMENT_TIMEOUT_SECONDS) as response:
+                if response.status == 200:
+                    # Retrying would download the whole file again for every segment
+                    raise RangeNotSupportedError(f"Range request for bytes {position}-{end} returned the whole file")
+                if response.status != 206:
+                    raise OSError(f"Range request returned HTTP {response.status}")
+                while position <= end and not failed.is_set():
+                    chunk = response.read(min(_READ_CHUNK_BYTES, end - position + 1))
+                    if not chunk:
+                        break
+                    _write_at(fd, chunk, position, write_lock)
+                    position += len(chunk)
+            if position <= end and not failed.is_set():
+                raise OSError(f"Connection closed at byte {position} of segment ending at {end}")
+        except (OSError, http.client.HTTPException) as e:
+            # Client errors (expired or forbidden URL) will not go away on retry
+            if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                raise
+            attempts += 1
+            if attempts > BotConfig.MUSIC_DOWNLOAD_SEGMENT_RETRIES:
+                raise
+            logger.debug("Retrying segment from byte %d (attempt %d): %s", position, attempts, e)
+            # Woken early if another segment fails meanwhile
+            failed.wait(0.5 * 2 ** (attempts - 1))
+
+
+def _write_at(fd: int, data: bytes, offset: int, write_lock: threading.Lock) -> None:
+    """Write data at an absolute file offset.
+
+    Args:
+        fd: Open file descriptor
+        data: Bytes to write
+        offset: File offset of the first byte
+        write_lock: Serializes seek-and-write when os.pwrite is unavailable
+    """
+    view = memoryview(data)
+    if hasattr(os, "pwrite"):
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+        return
+    with write_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while view:
+            view = view[os.write(fd, view):]
+
+#endregion
@@ -0,0 +1,192 @@
+"""Batched YouTube video metadata resolution through videos.list."""
+
+#region Imports
+
+import re
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+from shared.retry_helpers import run_with_retries
+from shared.config import BotConfig
+from ..executors import search_executor
+from ..quota import QuotaExhaustedError
+from .youtube_client import _execute_request
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# videos.list accepts at most 50 IDs per request
+_MAX_BATCH_SIZE = 50
+
+_DURATION_PATTERN = re.compile(
+    r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+#endregion
+
+
+#region Functions
+
+
+def parse_duration(duration: Optional[str]) -> Optional[int]:
+    """Convert an ISO 8601 duration from the YouTube API to seconds.
+
+    Args:
+        duration: Duration string such as "PT3M25S"
+
+    Returns:
+        Duration in seconds, or None if it cannot be parsed
+    """
+    match = _DURATION_PATTERN.match(duration or "")
+    if not match:
+        return None
+    parts = {name: int(value) for name, value in match.groupdict().items() if value}
+    return (
+        parts.get("days", 0) * 86400
+        + parts.get("hours", 0) * 3600
+        + parts.get("minutes", 0) * 60
+        + parts.get("seconds", 0)
+    )
+
+
+def _parse_video(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a videos.list item into a metadata record.
+
+    Args:
+        item: Item of a videos.list response
+
+    Returns:
+        Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys
+    """
+    snippet = item.get("snippet", {})
+    thumbnails = snippet.get("thumbnails", {})
+    thumbnail = thumbnails.get("medium") or thumbnails.get("default") or {}
+    return {
+        "id": item["id"],
+        "title": snippet.get("title"),
+        "duration": parse_duration(item.get("contentDetails", {}).get("duration")),
+        "thumbnail": thumbnail.get("url"),
+    }
+
+#endregion
+
+
+#region Resolver Class
+
+
+class MetadataResolver:
+    """Coalesces concurrent video metadata lookups into batched videos.list calls.
+
+    Lookups issued within a short window are sent together as one request of
+    up to 50 IDs, which costs a single quota unit.
+
+    Attributes:
+        batch_window_seconds: How long a lookup waits for others to join its batch.
+    """
+
+    def __init__(self, batch_window_seconds: float = BotConfig.YOUTUBE_METADATA_BATCH_WINDOW_SECONDS):
+        """Initialize the resolver.
+
+        Args:
+            batch_window_seconds: How long a lookup waits for others to join its batch.
+        """
+        self.batch_window_seconds = batch_window_seconds
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to running tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def resolve(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata of a video.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys,
+            or None if the video was not found or the lookup failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(video_id, []).append(future)
+        if len(self._pending) >= _MAX_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window_seconds, self._flush)
+        return await future
+
+    async def resolve_many(self, video_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get the metadata of several videos in as few requests as possible.
+
+        Args:
+            video_ids: YouTube video IDs
+
+        Returns:
+            Mapping of video ID to metadata (None for unresolved videos)
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        results = await asyncio.gather(*(self.resolve(video_id) for video_id in video_ids))
+        return dict(zip(video_ids, results))
+
+    def _flush(self) -> None:
+        """Send every pending lookup, in batches of at most 50 IDs."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch = {}
+            for video_id in list(self._pending)[:_MAX_BATCH_SIZE]:
+                batch[video_id] = self._pending.pop(video_id)
+            task = asyncio.create_task(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        """Run one videos.list request and resolve the waiting lookups.
+
+        Args:
+            batch: Mapping of video ID to the futures waiting for it
+        """
+        def build_request(youtube):
+            return youtube.videos().list(
+                part="snippet,contentDetails",
+                id=",".join(batch),
+                maxResults=_MAX_BATCH_SIZE,
+                fields="items(id,snippet(title,thumbnails(default(url),medium(url))),contentDetails(duration))",
+            )
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            response = await run_with_retries(
+                lambda: asyncio.wait_for(
+                    search_executor.run(_execute_request, build_request, "videos"),
+                    timeout=BotConfig.YOUTUBE_TITLE_TIMEOUT_SECONDS,
+                ),
+                retries=2,
+                delay_seconds=0.5,
+                backoff=2.0,
+                retry_exceptions=(asyncio.TimeoutError,),
+            )
+            for item in response.get("items", []):
+                record = _parse_video(item)
+                results[record["id"]] = record
+        except asyncio.TimeoutError:
+            logger.warning("YouTube metadata lookup timed out for %d videos", len(batch))
+        except QuotaExhaustedError:
+            logger.info("YouTube metadata lookup skipped for %d videos, the API quota is used up", len(batch))
+        except Exception:
+            logger.exception("YouTube metadata lookup failed for %d videos", len(batch))
+        for video_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    record = results.get(video_id)
+                    future.set_result(dict(record) if record else None)
+
+
+# Global resolver instance shared by every guild
+metadata_resolver = MetadataResolver()
+
+#endregion
@@ -0,0 +1,122 @@
+"""Read-ahead wrapper that keeps audio frames buffered ahead of playback."""
+
+#region Imports
+
+import logging
+import threading
+from collections import deque
+from typing import Deque
+import discord
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# discord.py sends one 20 ms frame per read
+FRAMES_PER_SECOND = 50
+
+#endregion
+
+
+#region Source Class
+
+
+class PrebufferedAudio(discord.AudioSource):
+    """Audio source that reads its wrapped source ahead on a background thread.
+
+    Frames start buffering as soon as the wrapper is created, so a source
+    built before its turn has FFmpeg running and its first seconds ready when
+    playback switches to it. The buffer also absorbs short FFmpeg stalls.
+
+    Attributes:
+        source: Wrapped audio source.
+    """
+
+    def __init__(self, source: discord.AudioSource, buffer_seconds: float):
+        """Start buffering the wrapped source.
+
+        Args:
+            source: Audio source to read ahead.
+            buffer_seconds: Audio kept buffered ahead, in seconds.
+        """
+        self.source = source
+        self._capacity = max(1, int(buffer_seconds * FRAMES_PER_SECOND))
+        self._frames: Deque[bytes] = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._finished = False
+        self._thread = threading.Thread(target=self._fill, name="prebuffer", daemon=True)
+        self._thread.start()
+
+    def read(self) -> bytes:
+        """Get the next frame, waiting for the reader thread if the buffer is empty.
+
+        Returns:
+            The next 20 ms frame, or b"" at the end of the audio.
+        """
+        if self._finished:
+            return b""
+        with self._condition:
+            while not self._frames and not self._stopped:
+                self._condition.wait()
+            if not self._frames:
+                self._finished = True
+                return b""
+            if len(self._frames) == self._capacity:
+                # Wakes the reader thread waiting for room
+                self._condition.notify_all()
+            frame = self._frames.popleft()
+        if not frame:
+            self._finished = True
+        return frame
+
+    def is_opus(self) -> bool:
+        """Whether the wrapped source produces Opus packets."""
+        return self.source.is_opus()
+
+    def cleanup(self) -> None:
+        """Stop the reader thread and clean up the wrapped source."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        # Ends a read blocked on FFmpeg's output
+        self.source.cleanup()
+
+    def _fill(self) -> None:
+        """Read frames into the buffer until the source ends or cleanup is called."""
+        ended = False
+        try:
+            while not self._stopped:
+                frame = self.source.read()
+                if not self._put(frame):
+                    return
+                if not frame:
+                    ended = True
+                    return
+        except Exception:
+            if not self._stopped:
+                logger.exception("Error reading ahead audio source")
+        finally:
+            if not ended:
+                # Always end the stream for the player, even after an error
+                self._put(b"")
+
+    def _put(self, frame: bytes) -> bool:
+        """Add a frame to the buffer, waiting for room.
+
+        Returns:
+            False if cleanup was called while waiting.
+        """
+        with self._condition:
+            while len(self._frames) >= self._capacity and not self._stopped:
+                self._condition.wait()
+            if self._stopped:
+                return False
+            self._frames.append(frame)
+            self._condition.notify_all()
+            return True
+
+#endregion
@@ -0,0 +1,147 @@
+"""Background prefetch of the next queued track."""
+
+#region Imports
+
+import time
+import asyncio
+import logging
+from ..state import MusicState
+from ..executors import current_guild
+from shared.config import BotConfig
+from .audio import PreparedAudio, prepare_audio, prewarm_audio_source
+from .voice import _channel_bitrate
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Functions
+
+
+def schedule_prefetch(state: MusicState) -> None:
+    """Start downloading the head of the queue unless it is already being prefetched.
+    
+    Args:
+        state: Guild music session
+    """
+    head = state.playlist.peek()
+    head_id = head.id if head is not None else None
+    if head_id is not None and head_id == state.prefetch_video_id:
+        return
+    state.cancel_prefetch()
+    if head_id is None:
+        return
+    state.prefetch_video_id = head_id
+    state.prefetch_taken = asyncio.Event()
+    state.prefetch_task = asyncio.create_task(_prefetch(state, head_id, state.prefetch_taken))
+
+
+def retarget_prefetch(state: MusicState) -> None:
+    """Re-point the prefetch at the new head of the queue after a queue change.
+    
+    Nothing is prefetched while the guild is not playing, since the next
+    /play downloads the head of the queue right away anyway.
+    
+    Args:
+        state: Guild music session
+    """
+    if state.current_song is None and state.prefetch_task is None:
+        return
+    schedule_prefetch(state)
+
+
+async def take_prefetched(state: MusicState, video_id: str) -> PreparedAudio:
+    """Get the audio for the track about to play.
+    
+    Uses the prefetched audio when the prefetch targeted this track, and
+    prepares it on the spot otherwise.
+    
+    Args:
+        state: Guild music session
+        video_id: YouTube video ID of the track about to play
+        
+    Returns:
+        Prepared audio, pinned in the audio cache when it is a file
+    """
+    task = state.prefetch_task
+    if task is not None and state.prefetch_video_id == video_id:
+        # Ends a wait to pre-warm, the track is needed now
+        state.prefetch_taken.set()
+        state.prefetch_task = None
+        state.prefetch_video_id = None
+        state.prefetch_taken = None
+        try:
+            return await task
+        except asyncio.TimeoutError:
+            logger.warning("Prefetch timed out for video %s, downloading again", video_id)
+        except Exception:
+            logger.warning("Prefetch failed for video %s, downloading again", video_id, exc_info=True)
+    else:
+        state.cancel_prefetch()
+    # Hold this guild's download slot so its files never collide with another guild's
+    async with state.download_lock:
+        return await prepare_audio(video_id, _channel_bitrate(state))
+
+
+async def _prefetch(state: MusicState, video_id: str, taken: asyncio.Event) -> PreparedAudio:
+    """Prepare a queued track in the background and pre-warm its audio source.
+    
+    The audio is prepared right away, but FFmpeg is only started
+    BotConfig.MUSIC_PREWARM_LEAD_SECONDS before the current track ends, so
+    no idle process or stream connection is held for the whole song. A
+    track taken before then starts cold.
+    
+    Args:
+        state: Guild music session
+        video_id: YouTube video ID to prepare
+        taken: Set when the playback loop takes the prefetch
+        
+    Returns:
+        Prepared audio, pinned in the audio cache when it is a file
+    """
+    current_guild.set(state.guild_id)
+    async with state.download_lock:
+        prepared = await prepare_audio(video_id, _channel_bitrate(state))
+    # Shared broadcasts start their own decoder when the track's turn comes
+    if BotConfig.MUSIC_PREBUFFER_SECONDS > 0 and not BotConfig.MUSIC_BROADCAST_ENABLED:
+        try:
+            delay = _prewarm_delay(state)
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(taken.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            if not taken.is_set():
+                await prewarm_audio_source(prepared)
+        except asyncio.CancelledError:
+            prepared.release()
+            raise
+        except Exception:
+            logger.warning("Could not pre-warm video %s, it will start cold", video_id, exc_info=True)
+    logger.info("Prefetched video %s for guild %s", video_id, state.guild_id)
+    return prepared
+
+
+def _prewarm_delay(state: MusicState) -> float:
+    """Get how long to wait before pre-warming the next track.
+    
+    Args:
+        state: Guild music session
+        
+    Returns:
+        Seconds until BotConfig.MUSIC_PREWARM_LEAD_SECONDS before the current
+        track ends, or 0 if its remaining time is unknown
+    """
+    song = state.current_song
+    if song is None or not song.duration or state.song_started_at is None:
+        return 0.0
+    remaining = song.duration - (time.monotonic() - state.song_started_at)
+    return max(0.0, remaining - BotConfig.MUSIC_PREWARM_LEAD_SECONDS)
+
+#endregion
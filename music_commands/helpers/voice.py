@@ -2,7 +2,8 @@
 
 #region Imports
 
-from ..state import state
+from typing import Optional
+from ..state import MusicState
 
 #endregion
 
@@ -10,30 +11,53 @@ from ..state import state
 #region Functions
 
 
-def _is_playing() -> bool:
+def _is_playing(state: MusicState) -> bool:
     """Check if the voice client is currently playing.
     
+    Args:
+        state: Guild music session
+        
     Returns:
         True if playing, False otherwise
     """
     return state.voice_client is not None and state.voice_client.is_playing()
 
 
-def _is_connected() -> bool:
+def _is_connected(state: MusicState) -> bool:
     """Check if the voice client is connected to a voice channel.
     
+    Args:
+        state: Guild music session
+        
     Returns:
         True if connected, False otherwise
     """
     return state.voice_client is not None and state.voice_client.is_connected()
 
 
-def _is_paused() -> bool:
+def _is_paused(state: MusicState) -> bool:
     """Check if the voice client is paused.
     
+    Args:
+        state: Guild music session
+        
     Returns:
         True if paused, False otherwise
     """
     return state.voice_client is not None and state.voice_client.is_paused()
 
+
+def _channel_bitrate(state: MusicState) -> Optional[int]:
+    """Get the bitrate of the voice channel the bot is connected to.
+    
+    Args:
+        state: Guild music session
+        
+    Returns:
+        Channel bitrate in bits per second, or None if not connected
+    """
+    if not _is_connected(state):
+        return None
+    return getattr(state.voice_client.channel, "bitrate", None)
+
 #endregion
@@ -2,26 +2,25 @@
 
 #region Imports
 
-import os
 import asyncio
 import logging
-import googleapiclient.discovery
+import html
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import googleapiclient.errors
 import pytubefix as pytube
-from dotenv import load_dotenv
 from shared.retry_helpers import run_with_retries
 from shared.config import BotConfig
+from ..search_cache import search_cache
+from ..executors import search_executor
+from ..quota import QuotaExhaustedError
+from .youtube_client import _execute_request
+from .metadata import metadata_resolver
 
 #endregion
 
 
 #region Setup
 
-# Load environment variables
-load_dotenv()
-
-_YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
-
 logger = logging.getLogger(__name__)
 
 #endregion
@@ -31,29 +30,38 @@ logger = logging.getLogger(__name__)
 
 # Play a video on YouTube
 async def get_youtube_song(query):
-    """Search YouTube for a song and get video ID and title.
+    """Search YouTube for a song and get its metadata.
+    
+    The title comes straight from the search response. Duration and
+    thumbnail come from a batched videos.list lookup. Once the quota
+    governor refuses API searches, results are scraped instead.
     
     Args:
         query: Search query string
         
     Returns:
-        Dictionary with 'id' and 'title' keys, or None if not found
+        Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys,
+        or None if not found
     """
+    # Answer repeated queries from the cache without spending API quota
+    cached = search_cache.get(query)
+    if cached is not None:
+        return cached
+
     # Use the YouTube Data API to search for videos that match the query
-    youtube = googleapiclient.discovery.build("youtube", "v3", developerKey=_YOUTUBE_API_KEY)
-    request = youtube.search().list(
-        part="id",
-        type="video",
-        q=query,
-        videoDefinition="high",
-        maxResults=1,
-        fields="items(id(videoId))"
-    )
-    loop = asyncio.get_running_loop()
+    def build_request(youtube):
+        return youtube.search().list(
+            part="snippet",
+            type="video",
+            q=query,
+            videoDefinition="high",
+            maxResults=1,
+            fields="items(id(videoId),snippet(title))"
+        )
     try:
         response = await run_with_retries(
             lambda: asyncio.wait_for(
-                loop.run_in_executor(None, request.execute),
+                search_executor.run(_execute_request, build_request, "search"),
                 timeout=BotConfig.YOUTUBE_SEARCH_TIMEOUT_SECONDS,
             ),
             retries=2,
@@ -71,16 +79,160 @@ async def get_youtube_song(query):
     except asyncio.TimeoutError:
         logger.warning("YouTube search timed out for query: %s", query)
         return None
+    except QuotaExhaustedError:
+        found = await _scrape_search(query)
+    else:
+        found = None
+        if response.get("items"):
+            item = response["items"][0]
+            # Search snippets HTML-escape titles
+            found = (item["id"]["videoId"], html.unescape(item.get("snippet", {}).get("title") or "") or None)
     
-    if response.get("items"):
-        video_id = response["items"][0]["id"]["videoId"]
-        video_title = await get_video_title(video_id)
-        return {"id": video_id, "title": video_title}
-    return None
+    if found is None:
+        return None
+    video_id, search_title = found
+    result = await metadata_resolver.resolve(video_id)
+    if result is None:
+        result = {"id": video_id, "title": search_title, "duration": None, "thumbnail": None}
+    elif not result.get("title"):
+        result["title"] = search_title
+    if not result["title"]:
+        result["title"] = await _scrape_video_title(video_id)
+    if result["title"]:
+        search_cache.put(query, result)
+    return result
+
+
+# Iterate over the videos of a YouTube playlist
+async def iter_playlist_pages(playlist_id: str, max_tracks: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Page through a YouTube playlist with playlistItems.list.
+    
+    Pages are yielded as soon as they arrive. Private and deleted videos
+    are skipped.
+    
+    Args:
+        playlist_id: YouTube playlist ID
+        max_tracks: Maximum number of videos to yield in total
+        
+    Yields:
+        Lists of dictionaries with 'id' and 'title' keys, one list per page
+        
+    Raises:
+        googleapiclient.errors.HttpError: If the playlist cannot be read
+        asyncio.TimeoutError: If a page request times out
+        QuotaExhaustedError: If the API quota is used up
+    """
+    page_token = None
+    remaining = max_tracks
+    while remaining > 0:
+        entries, page_token = await _get_playlist_page(playlist_id, page_token)
+        entries = entries[:remaining]
+        remaining -= len(entries)
+        if entries:
+            yield entries
+        if not page_token:
+            return
+
+
+async def _get_playlist_page(playlist_id: str, page_token: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page of a playlist.
+    
+    Args:
+        playlist_id: YouTube playlist ID
+        page_token: Token of the page to fetch, or None for the first page
+        
+    Returns:
+        Tuple of (entries, next page token)
+    """
+    def build_request(youtube):
+        return youtube.playlistItems().list(
+            part="snippet,status",
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=page_token,
+            fields="nextPageToken,items(snippet(title,resourceId(videoId)),status(privacyStatus))",
+        )
+    response = await run_with_retries(
+        lambda: asyncio.wait_for(
+            search_executor.run(_execute_request, build_request, "playlistItems"),
+            timeout=BotConfig.YOUTUBE_SEARCH_TIMEOUT_SECONDS,
+        ),
+        retries=2,
+        delay_seconds=0.5,
+        backoff=2.0,
+        retry_exceptions=(asyncio.TimeoutError,),
+    )
+    entries = []
+    for item in response.get("items", []):
+        if item.get("status", {}).get("privacyStatus") not in ("public", "unlisted"):
+            continue
+        snippet = item.get("snippet", {})
+        video_id = snippet.get("resourceId", {}).get("videoId")
+        if video_id:
+            entries.append({"id": video_id, "title": snippet.get("title"), "duration": None, "thumbnail": None})
+    return entries, response.get("nextPageToken")
+
+
+# Get the metadata of a YouTube video
+async def get_video_metadata(video_id: str) -> Dict[str, Any]:
+    """Get the title, duration and thumbnail of a YouTube video.
+    
+    Uses the batched videos.list resolver and falls back to scraping the
+    title with pytube when the API lookup fails.
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys;
+        'title' is None if it could not be retrieved
+    """
+    metadata = await metadata_resolver.resolve(video_id)
+    if metadata is None:
+        metadata = {"id": video_id, "title": None, "duration": None, "thumbnail": None}
+    if not metadata["title"]:
+        metadata["title"] = await _scrape_video_title(video_id)
+    return metadata
 
 
 # Get the title of a YouTube video
 async def get_video_title(video_id):
+    """Get the title of a YouTube video.
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Video title string, or None if error occurs
+    """
+    return (await get_video_metadata(video_id))["title"]
+
+
+async def _scrape_search(query: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Search YouTube by scraping the results page with pytube, without API quota.
+    
+    Args:
+        query: Search query string
+        
+    Returns:
+        Tuple of (video ID, title) of the first result, or None if not found or on error
+    """
+    def search() -> Optional[Tuple[str, Optional[str]]]:
+        videos = pytube.Search(query).videos
+        if not videos:
+            return None
+        return videos[0].video_id, videos[0].title
+    try:
+        return await asyncio.wait_for(search_executor.run(search), timeout=BotConfig.YOUTUBE_SEARCH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Scraped YouTube search timed out for query: %s", query)
+        return None
+    except Exception:
+        logger.exception("Scraped YouTube search failed for query: %s", query)
+        return None
+
+
+async def _scrape_video_title(video_id: str) -> Optional[str]:
     """Get the title of a YouTube video using pytube.
     
     Args:
@@ -90,11 +242,9 @@ async def get_video_title(video_id):
         Video title string, or None if error occurs
     """
     try:
-        loop = asyncio.get_running_loop()
         return await run_with_retries(
             lambda: asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
+                search_executor.run(
                     lambda: pytube.YouTube(f"https://www.youtube.com/watch?v={video_id}").title
                 ),
                 timeout=BotConfig.YOUTUBE_TITLE_TIMEOUT_SECONDS,
@@ -109,6 +259,6 @@ async def get_video_title(video_id):
         return None
     except Exception as e:
         logger.exception("Error retrieving video title for %s", video_id)
-
-        #endregion
         return None
+
+#endregion
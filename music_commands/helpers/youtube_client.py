@@ -0,0 +1,100 @@
+"""YouTube Data API client shared by the music helpers."""
+
+#region Imports
+
+import os
+import threading
+from typing import Any, Callable
+import httplib2
+import googleapiclient.discovery
+import googleapiclient.errors
+from dotenv import load_dotenv
+from shared.config import BotConfig
+from ..quota import QuotaExhaustedError, youtube_quota
+
+#endregion
+
+
+#region Setup
+
+# Load environment variables
+load_dotenv()
+
+_YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+
+# Long-lived API client, built on first use
+_youtube_client = None
+_youtube_client_lock = threading.Lock()
+
+# httplib2 transports are not thread-safe, so each executor thread gets its own
+_thread_local = threading.local()
+
+#endregion
+
+
+#region Client
+
+
+def _get_youtube_client():
+    """Get the shared YouTube Data API client, building it on first use.
+    
+    The client is built from the discovery document bundled with
+    google-api-python-client, so no discovery request is made.
+    
+    Returns:
+        YouTube Data API v3 resource
+    """
+    global _youtube_client
+    if _youtube_client is None:
+        with _youtube_client_lock:
+            if _youtube_client is None:
+                _youtube_client = googleapiclient.discovery.build(
+                    "youtube", "v3",
+                    developerKey=_YOUTUBE_API_KEY,
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+    return _youtube_client
+
+
+def _get_thread_http() -> httplib2.Http:
+    """Get the HTTP transport of the current thread, creating it if needed.
+    
+    Returns:
+        Thread-local httplib2 transport
+    """
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = httplib2.Http(timeout=BotConfig.YOUTUBE_SEARCH_TIMEOUT_SECONDS)
+        _thread_local.http = http
+    return http
+
+
+def _execute_request(build_request: Callable[[Any], Any], operation: str) -> Any:
+    """Build and execute an API request on the calling thread, charging its quota cost.
+    
+    Meant to run in an executor thread, so neither building the client nor
+    the HTTP round trip blocks the event loop.
+    
+    Args:
+        build_request: Callable taking the API client and returning the request
+        operation: API operation, "search", "videos" or "playlistItems"
+        
+    Returns:
+        Decoded API response
+        
+    Raises:
+        QuotaExhaustedError: If the quota governor refuses the call, or the API reports the quota exceeded
+    """
+    youtube_quota.acquire(operation)
+    request = build_request(_get_youtube_client())
+    try:
+        return request.execute(http=_get_thread_http())
+    except googleapiclient.errors.HttpError as error:
+        status = error.resp.status if error.resp is not None else None
+        if status == 403 and b"quotaExceeded" in (error.content or b""):
+            youtube_quota.mark_exhausted()
+            raise QuotaExhaustedError(operation) from error
+        raise
+
+#endregion
@@ -0,0 +1,204 @@
+"""Play history - Append-only log of played tracks with per-guild frequency and recency."""
+
+#region Imports
+
+import os
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from shared.config import BotConfig
+from .cache import DOWNLOAD_DIR
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Functions
+
+
+def _format_entry(played_at: float, guild_id: int, video_id: str, bitrate: Optional[int]) -> str:
+    """Format a play as a log line, with "-" for an unknown bitrate."""
+    return f"{int(played_at)} {guild_id} {video_id} {bitrate if bitrate is not None else '-'}\n"
+
+#endregion
+
+
+#region History Class
+
+
+class PlayHistory:
+    """Log of plays kept as one "timestamp guild_id video_id bitrate" line per play.
+
+    Each play is appended to the log and folded into per-guild statistics:
+    play count, last play time, bitrate of the channel it was last played
+    in, hours of the day the track is played at, and a weight that halves
+    every half-life so recent favourites outrank old ones. The log is
+    replayed on startup and trimmed to its most recent entries.
+
+    Attributes:
+        path: Log file.
+        max_entries: Plays kept when the log is trimmed.
+        half_life_seconds: Time for a play to lose half its weight.
+    """
+
+    def __init__(self, path: str, max_entries: int, half_life_seconds: float):
+        """Initialize the history and replay the log.
+
+        Args:
+            path: Log file.
+            max_entries: Plays kept when the log is trimmed.
+            half_life_seconds: Time for a play to lose half its weight.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.half_life_seconds = half_life_seconds
+        self._stats: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._load()
+
+    def record(self, guild_id: int, video_id: str, bitrate: Optional[int] = None, played_at: Optional[float] = None) -> None:
+        """Append a play to the log and update the guild's statistics.
+
+        Args:
+            guild_id: Guild the track was played in.
+            video_id: Video ID of the track.
+            bitrate: Bitrate of the voice channel in bits per second, if known.
+            played_at: Unix time of the play (defaults to now).
+        """
+        played_at = time.time() if played_at is None else played_at
+        self._count(guild_id, video_id, bitrate, played_at)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as log_file:
+                log_file.write(_format_entry(played_at, guild_id, video_id, bitrate))
+        except OSError:
+            logger.warning("Could not append to the play history", exc_info=True)
+
+    def guild_stats(self, guild_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Get a guild's most played tracks.
+
+        Args:
+            guild_id: Discord guild ID.
+            limit: Maximum number of tracks.
+
+        Returns:
+            Dictionaries with 'id', 'plays' and 'last_played' keys, most played first.
+        """
+        tracks = self._stats.get(guild_id, {})
+        ranked = sorted(tracks.items(), key=lambda item: (-item[1]["plays"], -item[1]["last_played"]))
+        return [
+            {"id": video_id, "plays": stats["plays"], "last_played": stats["last_played"]}
+            for video_id, stats in ranked[:limit]
+        ]
+
+    def predict(self, limit: int, now: Optional[float] = None) -> List[str]:
+        """Rank the tracks most likely to be played soon, across every guild.
+
+        A track scores its decayed play weight in each guild, boosted by the
+        share of its plays that happened around the current hour of the day.
+
+        Args:
+            limit: Maximum number of tracks.
+            now: Unix time to predict for (defaults to now).
+
+        Returns:
+            Video IDs, most likely first.
+        """
+        now = time.time() if now is None else now
+        hour = time.localtime(now).tm_hour
+        nearby_hours = ((hour - 1) % 24, hour, (hour + 1) % 24)
+        scores: Dict[str, float] = {}
+        for tracks in self._stats.values():
+            for video_id, stats in tracks.items():
+                weight = stats["weight"] * self._decay(now - stats["last_played"])
+                affinity = sum(stats["hours"].get(nearby, 0) for nearby in nearby_hours) / stats["plays"]
+                scores[video_id] = scores.get(video_id, 0.0) + weight * (1 + affinity)
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def last_bitrate(self, video_id: str) -> Optional[int]:
+        """Get the bitrate of the voice channel a track was last played in.
+
+        Args:
+            video_id: Video ID of the track.
+
+        Returns:
+            Bitrate in bits per second, or None if unknown.
+        """
+        latest = max(
+            (tracks[video_id] for tracks in self._stats.values() if video_id in tracks),
+            key=lambda stats: stats["last_played"],
+            default=None,
+        )
+        return latest["bitrate"] if latest is not None else None
+
+    def _count(self, guild_id: int, video_id: str, bitrate: Optional[int], played_at: float) -> None:
+        """Fold a play into the guild's statistics."""
+        stats = self._stats.setdefault(guild_id, {}).get(video_id)
+        if stats is None:
+            stats = {"plays": 0, "last_played": played_at, "bitrate": bitrate, "weight": 0.0, "hours": {}}
+            self._stats[guild_id][video_id] = stats
+        elapsed = max(0.0, played_at - stats["last_played"])
+        stats["weight"] = stats["weight"] * self._decay(elapsed) + 1
+        stats["plays"] += 1
+        if played_at >= stats["last_played"]:
+            stats["last_played"] = played_at
+            stats["bitrate"] = bitrate
+        hour = time.localtime(played_at).tm_hour
+        stats["hours"][hour] = stats["hours"].get(hour, 0) + 1
+
+    def _decay(self, elapsed: float) -> float:
+        """Get the factor a weight keeps after some time."""
+        return 0.5 ** (max(0.0, elapsed) / self.half_life_seconds)
+
+    def _load(self) -> None:
+        """Replay the log, rewriting it without its oldest entries if it grew too long."""
+        entries: Deque[Tuple[float, int, str, Optional[int]]] = deque(maxlen=self.max_entries)
+        total = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as log_file:
+                for line in log_file:
+                    parts = line.split()
+                    # Lines written before bitrates were logged have three fields
+                    if len(parts) not in (3, 4):
+                        continue
+                    try:
+                        bitrate = int(parts[3]) if len(parts) == 4 and parts[3] != "-" else None
+                        entries.append((float(parts[0]), int(parts[1]), parts[2], bitrate))
+                    except ValueError:
+                        continue
+                    total += 1
+        except FileNotFoundError:
+            return
+        except OSError:
+            logger.warning("Play history is unreadable, starting empty", exc_info=True)
+            return
+        for played_at, guild_id, video_id, bitrate in entries:
+            self._count(guild_id, video_id, bitrate, played_at)
+        if total > len(entries):
+            self._rewrite(entries)
+
+    def _rewrite(self, entries: Deque[Tuple[float, int, str, Optional[int]]]) -> None:
+        """Atomically replace the log with the given entries."""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as log_file:
+                log_file.writelines(_format_entry(*entry) for entry in entries)
+            os.replace(temp_path, self.path)
+        except OSError:
+            logger.warning("Could not trim the play history", exc_info=True)
+
+
+# Global history shared by every guild
+play_history = PlayHistory(
+    os.path.join(DOWNLOAD_DIR, "play_history.log"),
+    BotConfig.MUSIC_HISTORY_MAX_ENTRIES,
+    BotConfig.MUSIC_HISTORY_HALF_LIFE_SECONDS,
+)
+
+#endregion
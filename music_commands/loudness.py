@@ -0,0 +1,206 @@
+"""Loudness index - Background loudness analysis of cached audio files."""
+
+#region Imports
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from shared.config import BotConfig
+from .cache import audio_cache, DOWNLOAD_DIR
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# loudnorm prints its measurements as a JSON object at the end of stderr
+_LOUDNORM_JSON = re.compile(r'\{[^{}]*"input_i"[^{}]*\}')
+
+#endregion
+
+
+#region Functions
+
+
+def analyze_loudness(file_path: str) -> Optional[Dict[str, float]]:
+    """Measure the loudness of an audio file with FFmpeg's loudnorm filter.
+
+    Args:
+        file_path: Audio file to measure.
+
+    Returns:
+        Dictionary with integrated loudness 'lufs' and 'true_peak' in dBTP,
+        or None if the file could not be measured (e.g. silence).
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-nostats", "-i", file_path,
+            "-vn", "-af", "loudnorm=print_format=json", "-f", "null", "-",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=BotConfig.MUSIC_LOUDNESS_ANALYSIS_TIMEOUT_SECONDS,
+        check=False,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    match = _LOUDNORM_JSON.search(result.stderr.decode("utf-8", "replace"))
+    if result.returncode != 0 or match is None:
+        return None
+    measured = json.loads(match.group(0))
+    try:
+        lufs = float(measured["input_i"])
+        true_peak = float(measured["input_tp"])
+    except (KeyError, ValueError):
+        return None
+    if lufs == float("-inf"):
+        return None
+    return {"lufs": lufs, "true_peak": true_peak}
+
+#endregion
+
+
+#region Index Class
+
+
+class LoudnessIndex:
+    """Sidecar index of measured loudness, keyed by video ID.
+
+    Analysis runs once per video in a small worker pool after the audio is
+    cached, and the result is persisted as JSON so replays and restarts
+    reuse it. Silent tracks and failed analyses are recorded as failed, so
+    they are not analyzed again on every play. Playback only turns the
+    measurement into a static gain.
+
+    Attributes:
+        target_lufs: Integrated loudness tracks are normalized to.
+    """
+
+    def __init__(self, persist_path: str, target_lufs: float, workers: int):
+        """Initialize the index and load persisted measurements.
+
+        Args:
+            persist_path: JSON file holding the measurements.
+            target_lufs: Integrated loudness tracks are normalized to.
+            workers: Number of concurrent analyses.
+        """
+        self.target_lufs = target_lufs
+        self._persist_path = persist_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loudness")
+        self._load()
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Get the measurement of a video.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            Copy of the measurement, or None if the video was not analyzed
+            or its analysis failed.
+        """
+        with self._lock:
+            entry = self._entries.get(video_id)
+            return dict(entry) if entry is not None and not entry.get("failed") else None
+
+    def get_gain(self, video_id: str) -> Optional[float]:
+        """Get the static gain that brings a video to the target loudness.
+
+        Boosts are capped so the true peak stays under the configured
+        ceiling and never exceed BotConfig.MUSIC_LOUDNESS_MAX_BOOST_DB.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            Gain in dB, or None if the video was not analyzed or its analysis failed.
+        """
+        entry = self.get(video_id)
+        if entry is None:
+            return None
+        gain = self.target_lufs - entry["lufs"]
+        headroom = BotConfig.MUSIC_LOUDNESS_TRUE_PEAK_DB - entry["true_peak"]
+        return min(gain, headroom, BotConfig.MUSIC_LOUDNESS_MAX_BOOST_DB)
+
+    def schedule(self, video_id: str, file_path: str) -> None:
+        """Queue a cached file for analysis unless its video is known or pending.
+
+        The file is pinned in the audio cache until the analysis finishes.
+
+        Args:
+            video_id: YouTube video ID.
+            file_path: Cached audio file of the video.
+        """
+        with self._lock:
+            if video_id in self._entries or video_id in self._pending:
+                return
+            self._pending.add(video_id)
+        audio_cache.pin(file_path)
+        self._executor.submit(self._analyze, video_id, file_path)
+
+    def _analyze(self, video_id: str, file_path: str) -> None:
+        """Analyze a file on a worker thread and record the result, or that it failed."""
+        measurement = None
+        try:
+            started = time.monotonic()
+            measurement = analyze_loudness(file_path)
+            if measurement is None:
+                logger.info("No loudness measurement for video %s", video_id)
+            else:
+                logger.info(
+                    "Measured video %s at %.1f LUFS in %.1fs",
+                    video_id, measurement["lufs"], time.monotonic() - started,
+                )
+        except Exception:
+            logger.warning("Loudness analysis failed for video %s", video_id, exc_info=True)
+        finally:
+            with self._lock:
+                self._entries[video_id] = measurement if measurement is not None else {"failed": True}
+                self._pending.discard(video_id)
+                self._save_locked()
+            audio_cache.unpin(file_path)
+
+    def _load(self) -> None:
+        """Load persisted measurements."""
+        try:
+            with open(self._persist_path, 'r', encoding='utf-8') as index_file:
+                entries = json.load(index_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("Loudness index is unreadable, starting empty", exc_info=True)
+            return
+        self._entries = {
+            video_id: entry for video_id, entry in entries.items()
+            if isinstance(entry, dict) and (entry.get("failed") is True or ("lufs" in entry and "true_peak" in entry))
+        }
+
+    def _save_locked(self) -> None:
+        """Atomically write the measurements to disk."""
+        temp_path = f"{self._persist_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as index_file:
+                json.dump(self._entries, index_file)
+            os.replace(temp_path, self._persist_path)
+        except OSError:
+            logger.warning("Could not save the loudness index", exc_info=True)
+
+
+# Global index shared by every guild
+loudness_index = LoudnessIndex(
+    os.path.join(DOWNLOAD_DIR, "loudness_index.json"),
+    BotConfig.MUSIC_LOUDNESS_TARGET_LUFS,
+    BotConfig.MUSIC_LOUDNESS_WORKERS,
+)
+
+#endregion
@@ -0,0 +1,250 @@
+"""Music queue - Compact track records and a deque-backed track queue."""
+
+#region Imports
+
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+#endregion
+
+
+#region Functions
+
+
+def format_duration(seconds: Optional[int]) -> str:
+    """Format a duration in seconds as H:MM:SS or M:SS.
+
+    Args:
+        seconds: Duration in seconds, or None if unknown.
+
+    Returns:
+        Formatted duration, or "?:??" if unknown.
+    """
+    if seconds is None:
+        return "?:??"
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+#endregion
+
+
+#region Track Class
+
+
+class Track:
+    """A queued song.
+
+    Attributes:
+        id: YouTube video ID.
+        title: Video title, or None if it could not be retrieved.
+        duration: Duration in seconds, or None if unknown.
+        thumbnail: Thumbnail URL, or None if unknown.
+    """
+
+    __slots__ = ("id", "title", "duration", "thumbnail")
+
+    def __init__(self, id: str, title: Optional[str] = None, duration: Optional[int] = None, thumbnail: Optional[str] = None):
+        """Initialize a track.
+
+        Args:
+            id: YouTube video ID.
+            title: Video title.
+            duration: Duration in seconds.
+            thumbnail: Thumbnail URL.
+        """
+        self.id = id
+        self.title = title
+        self.duration = duration
+        self.thumbnail = thumbnail
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Track":
+        """Build a track from a metadata dictionary.
+
+        Args:
+            data: Dictionary with an 'id' key and optional 'title', 'duration' and 'thumbnail' keys.
+
+        Returns:
+            The new track.
+        """
+        return cls(data["id"], data.get("title"), data.get("duration"), data.get("thumbnail"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the track to a metadata dictionary.
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys.
+        """
+        return {"id": self.id, "title": self.title, "duration": self.duration, "thumbnail": self.thumbnail}
+
+    def __repr__(self) -> str:
+        return f"Track(id={self.id!r}, title={self.title!r})"
+
+#endregion
+
+
+#region Queue Class
+
+
+class TrackQueue:
+    """FIFO queue of tracks with O(1) dequeue and a running total duration.
+
+    Positions are 0-based. Swap, remove and move work in place on the
+    underlying deque, without rebuilding the queue.
+
+    Attributes:
+        on_change: Called after every change to the queue, if set.
+    """
+
+    def __init__(self, tracks: Iterable[Track] = (), on_change: Optional[Callable[[], None]] = None):
+        """Initialize the queue.
+
+        Args:
+            tracks: Initial tracks, in play order.
+            on_change: Called after every change to the queue.
+        """
+        self._tracks: Deque[Track] = deque()
+        self._total_duration = 0
+        self._unknown_durations = 0
+        for track in tracks:
+            self._add(track)
+        self.on_change = on_change
+
+    @property
+    def total_duration(self) -> int:
+        """Sum of the known durations of queued tracks, in seconds."""
+        return self._total_duration
+
+    @property
+    def unknown_durations(self) -> int:
+        """Number of queued tracks whose duration is unknown."""
+        return self._unknown_durations
+
+    def append(self, track: Track) -> None:
+        """Add a track at the end of the queue.
+
+        Args:
+            track: Track to add.
+        """
+        self._add(track)
+        self._changed()
+
+    def extend(self, tracks: Iterable[Track]) -> None:
+        """Add tracks at the end of the queue, keeping their order.
+
+        Args:
+            tracks: Tracks to add.
+        """
+        for track in tracks:
+            self._add(track)
+        self._changed()
+
+    def popleft(self) -> Track:
+        """Remove and return the next track.
+
+        Returns:
+            The track at the head of the queue.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        track = self._tracks.popleft()
+        self._count(track, -1)
+        self._changed()
+        return track
+
+    def peek(self) -> Optional[Track]:
+        """Get the next track without removing it.
+
+        Returns:
+            The track at the head of the queue, or None if empty.
+        """
+        return self._tracks[0] if self._tracks else None
+
+    def swap(self, index1: int, index2: int) -> None:
+        """Swap two tracks.
+
+        Args:
+            index1: Position of the first track.
+            index2: Position of the second track.
+        """
+        self._tracks[index1], self._tracks[index2] = self._tracks[index2], self._tracks[index1]
+        self._changed()
+
+    def remove(self, index: int) -> Track:
+        """Remove the track at a position.
+
+        Args:
+            index: Position of the track.
+
+        Returns:
+            The removed track.
+        """
+        track = self._tracks[index]
+        del self._tracks[index]
+        self._count(track, -1)
+        self._changed()
+        return track
+
+    def move(self, source: int, destination: int) -> None:
+        """Move a track to another position.
+
+        Args:
+            source: Current position of the track.
+            destination: Position the track should end up at.
+        """
+        track = self._tracks[source]
+        del self._tracks[source]
+        self._tracks.insert(destination, track)
+        self._changed()
+
+    def clear(self) -> None:
+        """Remove every track."""
+        self._tracks.clear()
+        self._total_duration = 0
+        self._unknown_durations = 0
+        self._changed()
+
+    def page(self, start: int, count: int) -> List[Track]:
+        """Get a slice of the queue for display.
+
+        Args:
+            start: Position of the first track.
+            count: Maximum number of tracks.
+
+        Returns:
+            Tracks from start to start + count.
+        """
+        return list(islice(self._tracks, start, start + count))
+
+    def _add(self, track: Track) -> None:
+        """Add a track at the end of the queue without notifying."""
+        self._tracks.append(track)
+        self._count(track, 1)
+
+    def _changed(self) -> None:
+        """Notify the change callback."""
+        if self.on_change is not None:
+            self.on_change()
+
+    def _count(self, track: Track, sign: int) -> None:
+        """Update the running duration totals for an added or removed track."""
+        if track.duration is None:
+            self._unknown_durations += sign
+        else:
+            self._total_duration += sign * track.duration
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __iter__(self) -> Iterator[Track]:
+        return iter(self._tracks)
+
+    def __getitem__(self, index: int) -> Track:
+        return self._tracks[index]
+
+#endregion
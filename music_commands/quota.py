@@ -0,0 +1,227 @@
+"""YouTube quota - Accounting and admission of YouTube Data API calls shared by every guild."""
+
+#region Imports
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from shared.config import BotConfig
+from .cache import DOWNLOAD_DIR
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+# Quota units charged by the YouTube Data API per request
+OPERATION_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "playlistItems": 1,
+}
+
+#endregion
+
+
+#region Exceptions
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when a YouTube Data API call is refused to save quota."""
+
+    def __init__(self, operation: str):
+        """Initialize the error.
+
+        Args:
+            operation: API operation that was refused.
+        """
+        super().__init__(f"YouTube API quota too low for {operation}")
+        self.operation = operation
+
+#endregion
+
+
+#region Functions
+
+
+def _get_reset_timezone() -> tzinfo:
+    """Get the timezone the daily quota resets in, falling back to UTC-8 without tz data."""
+    try:
+        return ZoneInfo(BotConfig.YOUTUBE_QUOTA_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Timezone %s is unknown, assuming UTC-8 for quota resets", BotConfig.YOUTUBE_QUOTA_TIMEZONE)
+        return timezone(timedelta(hours=-8))
+
+#endregion
+
+
+#region Governor Class
+
+
+class QuotaGovernor:
+    """Daily YouTube Data API budget with token-bucket admission.
+
+    Every request is charged its unit cost against the daily limit, which
+    resets at midnight Pacific time like the API's own quota. Searches, by
+    far the most expensive call, are admitted through a token bucket
+    refilling at a steady hourly rate, so a busy hour cannot spend the whole
+    evening's quota. They also stop once the remaining budget falls to the
+    search reserve, leaving the rest for cheap metadata and playlist
+    lookups; refused searches fall back to scraping. When the API itself
+    reports the quota exhausted, every call is refused until the next reset.
+
+    Units used today are persisted so a restart does not forget them.
+
+    Attributes:
+        daily_limit: Units available per day.
+        search_reserve: Remaining units below which searches are refused.
+    """
+
+    def __init__(self, persist_path: str, daily_limit: int, search_reserve: int, burst_units: int, refill_units_per_hour: float):
+        """Initialize the governor and load today's usage.
+
+        Args:
+            persist_path: JSON file holding the units used today.
+            daily_limit: Units available per day.
+            search_reserve: Remaining units below which searches are refused.
+            burst_units: Capacity of the search token bucket.
+            refill_units_per_hour: Rate the search token bucket refills at.
+        """
+        self.daily_limit = daily_limit
+        self.search_reserve = search_reserve
+        self._persist_path = persist_path
+        self._burst_units = burst_units
+        self._refill_per_second = refill_units_per_hour / 3600
+        self._tokens = float(burst_units)
+        self._refilled_at = time.monotonic()
+        self._timezone = _get_reset_timezone()
+        self._day = self._today()
+        self._used = 0
+        self._exhausted = False
+        self._refused: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def acquire(self, operation: str) -> None:
+        """Charge an API call, or refuse it if the budget does not allow it.
+
+        Args:
+            operation: "search", "videos" or "playlistItems".
+
+        Raises:
+            QuotaExhaustedError: If the call must not be made.
+        """
+        cost = OPERATION_COSTS[operation]
+        with self._lock:
+            self._roll_over_locked()
+            self._refill_locked()
+            remaining = self.daily_limit - self._used
+            search = operation == "search"
+            reserve = self.search_reserve if search else 0
+            if self._exhausted or remaining - reserve < cost or (search and self._tokens < cost):
+                self._refused[operation] = self._refused.get(operation, 0) + 1
+                raise QuotaExhaustedError(operation)
+            self._used += cost
+            if search:
+                self._tokens -= cost
+                if remaining - cost < reserve + cost:
+                    logger.warning("YouTube API quota down to %d units, searches fall back to scraping", remaining - cost)
+            self._save_locked()
+
+    def mark_exhausted(self) -> None:
+        """Refuse every call until the next reset, after the API reported the quota exceeded."""
+        with self._lock:
+            self._roll_over_locked()
+            if not self._exhausted:
+                logger.warning("YouTube API quota exceeded after %d counted units", self._used)
+            self._exhausted = True
+            self._save_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the state of the budget.
+
+        Returns:
+            Units used and remaining today, tokens in the search bucket,
+            whether searches are allowed, seconds until the reset and refused calls
+        """
+        with self._lock:
+            self._roll_over_locked()
+            self._refill_locked()
+            remaining = 0 if self._exhausted else max(0, self.daily_limit - self._used)
+            now = datetime.now(self._timezone)
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), self._timezone)
+            return {
+                "used": self._used,
+                "remaining": remaining,
+                "limit": self.daily_limit,
+                "bucket": int(self._tokens),
+                "searches_allowed": (
+                    remaining - self.search_reserve >= OPERATION_COSTS["search"]
+                    and self._tokens >= OPERATION_COSTS["search"]
+                ),
+                "reset_seconds": int((midnight - now).total_seconds()),
+                "refused": dict(self._refused),
+            }
+
+    def _today(self) -> str:
+        """Get the current quota day."""
+        return datetime.now(self._timezone).date().isoformat()
+
+    def _roll_over_locked(self) -> None:
+        """Start a new day's budget after the reset."""
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+            self._exhausted = False
+            self._refused = {}
+
+    def _refill_locked(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self._burst_units, self._tokens + (now - self._refilled_at) * self._refill_per_second)
+        self._refilled_at = now
+
+    def _load(self) -> None:
+        """Load today's usage, ignoring a record from a previous day."""
+        try:
+            with open(self._persist_path, 'r', encoding='utf-8') as quota_file:
+                record = json.load(quota_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("YouTube quota record is unreadable, starting from zero", exc_info=True)
+            return
+        if isinstance(record, dict) and record.get("day") == self._day:
+            self._used = int(record.get("used", 0))
+            self._exhausted = bool(record.get("exhausted", False))
+
+    def _save_locked(self) -> None:
+        """Atomically write today's usage to disk."""
+        temp_path = f"{self._persist_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._persist_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as quota_file:
+                json.dump({"day": self._day, "used": self._used, "exhausted": self._exhausted}, quota_file)
+            os.replace(temp_path, self._persist_path)
+        except OSError:
+            logger.warning("Could not save the YouTube quota record", exc_info=True)
+
+
+# Global governor shared by every guild
+youtube_quota = QuotaGovernor(
+    os.path.join(DOWNLOAD_DIR, "youtube_quota.json"),
+    BotConfig.YOUTUBE_DAILY_QUOTA_UNITS,
+    BotConfig.YOUTUBE_QUOTA_SEARCH_RESERVE_UNITS,
+    BotConfig.YOUTUBE_QUOTA_BURST_UNITS,
+    BotConfig.YOUTUBE_QUOTA_REFILL_UNITS_PER_HOUR,
+)
+
+#endregion
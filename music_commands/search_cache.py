@@ -0,0 +1,156 @@
+"""YouTube search cache - TTL and size-bounded cache of resolved search queries."""
+
+#region Imports
+
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from shared.config import BotConfig
+from .cache import DOWNLOAD_DIR
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Cache Class
+
+
+class SearchCache:
+    """Cache of search query results with expiry and LRU eviction.
+
+    Queries are normalized (case-folded, whitespace collapsed) so trivial
+    variations share an entry. Entries store the resolved video ``id`` and
+    ``title`` and can optionally be persisted to a small JSON file.
+
+    Attributes:
+        ttl_seconds: Lifetime of an entry in seconds.
+        max_entries: Maximum number of entries kept.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that were not cached or had expired.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, persist_path: Optional[str] = None):
+        """Initialize the cache and load persisted entries.
+
+        Args:
+            ttl_seconds: Lifetime of an entry in seconds.
+            max_entries: Maximum number of entries kept.
+            persist_path: Optional JSON file used to keep entries across restarts.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._persist_path = persist_path
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._load()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a search query into a cache key.
+
+        Args:
+            query: Raw search query.
+
+        Returns:
+            Case-folded query with collapsed whitespace.
+        """
+        return " ".join(query.casefold().split())
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get the cached result of a query.
+
+        Args:
+            query: Raw search query.
+
+        Returns:
+            Copy of the cached result, or None on a miss.
+        """
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is None or entry["expires"] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry["result"])
+
+    def put(self, query: str, result: Dict[str, Any]) -> None:
+        """Cache the result of a query.
+
+        Args:
+            query: Raw search query.
+            result: Resolved result with at least 'id' and 'title' keys.
+        """
+        key = self.normalize(query)
+        self._entries[key] = {"result": dict(result), "expires": time.time() + self.ttl_seconds}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate and entry count.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _load(self) -> None:
+        """Load persisted entries, dropping expired ones."""
+        if not self._persist_path:
+            return
+        try:
+            with open(self._persist_path, 'r', encoding='utf-8') as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("Search cache file is unreadable, starting empty", exc_info=True)
+            return
+        now = time.time()
+        for key, entry in entries:
+            if entry.get("expires", 0) > now:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        """Atomically write the entries to the persist file, if any."""
+        if not self._persist_path:
+            return
+        temp_path = f"{self._persist_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as cache_file:
+                json.dump(list(self._entries.items()), cache_file)
+            os.replace(temp_path, self._persist_path)
+        except OSError:
+            logger.warning("Could not save the search cache", exc_info=True)
+
+
+# Global cache instance shared by every guild
+search_cache = SearchCache(
+    BotConfig.YOUTUBE_SEARCH_CACHE_TTL_SECONDS,
+    BotConfig.YOUTUBE_SEARCH_CACHE_MAX_ENTRIES,
+    os.path.join(DOWNLOAD_DIR, "search_cache.json") if BotConfig.YOUTUBE_SEARCH_CACHE_PERSIST else None,
+)
+
+#endregion
@@ -0,0 +1,144 @@
+"""Queue snapshots - Per-guild queues persisted across restarts and gateway drops."""
+
+#region Imports
+
+import os
+import json
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from shared.config import BotConfig
+from .cache import DOWNLOAD_DIR
+from .queue import Track
+
+if TYPE_CHECKING:
+    from .state import MusicState
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Store Class
+
+
+class QueueSnapshotStore:
+    """One small JSON file per guild holding its current song and queued tracks.
+
+    Every queue change marks the guild dirty, and dirty guilds are written
+    together after a short delay, so a multi-song /queue costs one write.
+    Track records keep the resolved ID, title, duration and thumbnail, so a
+    restored queue plays without any search or metadata lookup.
+
+    Attributes:
+        directory: Directory holding the snapshot files.
+        delay_seconds: Delay coalescing changes into one write.
+    """
+
+    def __init__(self, directory: str, delay_seconds: float):
+        """Initialize the store. Snapshots are only read when a guild session is created.
+
+        Args:
+            directory: Directory holding the snapshot files.
+            delay_seconds: Delay coalescing changes into one write.
+        """
+        self.directory = directory
+        self.delay_seconds = delay_seconds
+        self._dirty: Dict[int, "MusicState"] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def load(self, guild_id: int) -> List[Track]:
+        """Read the saved queue of a guild.
+
+        The song that was playing is put back at the head of the queue, so
+        it replays from the start.
+
+        Args:
+            guild_id: Discord guild ID.
+
+        Returns:
+            Tracks to queue, empty if the guild has no snapshot.
+        """
+        try:
+            with open(self._path(guild_id), 'r', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError):
+            logger.warning("Queue snapshot of guild %s is unreadable, ignoring it", guild_id, exc_info=True)
+            return []
+        records = [snapshot.get("current")] + list(snapshot.get("queue", []))
+        return [
+            Track.from_dict(record) for record in records
+            if isinstance(record, dict) and isinstance(record.get("id"), str)
+        ]
+
+    def mark_dirty(self, state: "MusicState") -> None:
+        """Schedule a write of a session's queue.
+
+        Args:
+            state: Session whose current song or queue changed.
+        """
+        if state.guild_id is None:
+            return
+        self._dirty[state.guild_id] = state
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside the bot's event loop there is nothing to coalesce with
+            self.flush()
+            return
+        self._handle = loop.call_later(self.delay_seconds, self.flush)
+
+    def flush(self) -> None:
+        """Write every pending snapshot now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        dirty, self._dirty = self._dirty, {}
+        for guild_id, state in dirty.items():
+            self._save(guild_id, state.current_song, list(state.playlist))
+
+    def _save(self, guild_id: int, current: Optional[Track], tracks: List[Track]) -> None:
+        """Atomically write a guild's snapshot, or delete it once nothing is left to play."""
+        path = self._path(guild_id)
+        if current is None and not tracks:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("Could not delete the queue snapshot of guild %s", guild_id, exc_info=True)
+            return
+        snapshot: Dict[str, Any] = {
+            "current": current.to_dict() if current is not None else None,
+            "queue": [track.to_dict() for track in tracks],
+        }
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+                json.dump(snapshot, snapshot_file, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError:
+            logger.warning("Could not save the queue snapshot of guild %s", guild_id, exc_info=True)
+
+    def _path(self, guild_id: int) -> str:
+        """Get the snapshot file of a guild."""
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+
+# Global store shared by every guild
+queue_snapshots = QueueSnapshotStore(
+    os.path.join(DOWNLOAD_DIR, "queues"),
+    BotConfig.MUSIC_QUEUE_SNAPSHOT_DELAY_SECONDS,
+)
+
+#endregion
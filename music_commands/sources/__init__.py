@@ -0,0 +1,81 @@
+"""Music sources - Pluggable backends for search, metadata and stream resolution."""
+
+#region Imports
+
+import os
+from typing import Optional
+from shared.config import BotConfig
+from ..cache import DOWNLOAD_DIR
+from .base import SourceProvider
+from .local import LocalProvider
+
+#endregion
+
+
+#region Setup
+
+_provider: Optional[SourceProvider] = None
+
+#endregion
+
+
+#region Functions
+
+
+def create_provider(name: str) -> SourceProvider:
+    """Build a source provider by name.
+
+    Args:
+        name: "youtube" or "local"
+
+    Returns:
+        The new provider
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "youtube":
+        # Imported here because the YouTube provider builds on the helpers, which use this package
+        from .youtube import YouTubeProvider
+        return YouTubeProvider()
+    if name == LocalProvider.name:
+        return LocalProvider(
+            os.path.join(DOWNLOAD_DIR, "local_source"),
+            BotConfig.MUSIC_LOCAL_SOURCE_LATENCY_SECONDS,
+            BotConfig.MUSIC_LOCAL_SOURCE_TRACK_SECONDS,
+        )
+    raise ValueError(f"Unknown music source provider: {name}")
+
+
+def get_provider() -> SourceProvider:
+    """Get the active source provider, building the configured one on first use.
+
+    Returns:
+        The active provider
+    """
+    global _provider
+    if _provider is None:
+        _provider = create_provider(BotConfig.MUSIC_SOURCE_PROVIDER)
+    return _provider
+
+
+def set_provider(provider: SourceProvider) -> None:
+    """Replace the active source provider.
+
+    Args:
+        provider: Provider every later lookup goes through
+    """
+    global _provider
+    _provider = provider
+
+#endregion
+
+
+#region Exports
+
+__all__ = [
+    'SourceProvider', 'LocalProvider',
+    'create_provider', 'get_provider', 'set_provider'
+]
+
+#endregion
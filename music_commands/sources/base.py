@@ -0,0 +1,64 @@
+"""Source provider interface - Where songs are searched, described and streamed from."""
+
+#region Imports
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from ..stream_cache import StreamInfo
+
+#endregion
+
+
+#region Provider Class
+
+
+class SourceProvider(ABC):
+    """Backend the music pipeline gets songs from.
+
+    Search and metadata lookups are awaited on the event loop. Stream
+    resolution is blocking and runs on the resolve executor. The streams it
+    returns must have HTTP URLs that honour Range requests, since downloads
+    go through the segmented downloader.
+
+    Attributes:
+        name: Provider name, as used by BotConfig.MUSIC_SOURCE_PROVIDER.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    async def search(self, query: str) -> Optional[Dict[str, Any]]:
+        """Find the best match for a search query.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys,
+            or None if nothing was found
+        """
+
+    @abstractmethod
+    async def get_metadata(self, video_id: str) -> Dict[str, Any]:
+        """Get the title, duration and thumbnail of a song.
+
+        Args:
+            video_id: Song ID
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys;
+            'title' is None if it could not be retrieved
+        """
+
+    @abstractmethod
+    def resolve_streams(self, video_id: str) -> List[StreamInfo]:
+        """Resolve the audio-only streams of a song. Blocking.
+
+        Args:
+            video_id: Song ID
+
+        Returns:
+            Audio streams that could be resolved
+        """
+
+#endregion
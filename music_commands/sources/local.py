@@ -0,0 +1,256 @@
+"""Local source provider - Generated audio served over localhost, for offline benchmarks."""
+
+#region Imports
+
+import os
+import re
+import math
+import time
+import wave
+import array
+import asyncio
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from ..stream_cache import StreamInfo
+from .base import SourceProvider
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_RATE = 48000
+_CHANNELS = 2
+_ITAG = 0
+
+# Lifetime advertised in the 'expire' parameter of served URLs
+_URL_LIFETIME_SECONDS = 6 * 60 * 60
+
+_RANGE_PATTERN = re.compile(r'^bytes=(\d+)-(\d*)$')
+
+#endregion
+
+
+#region Functions
+
+
+def _generate_tone(file_path: str, frequency: float, seconds: int) -> None:
+    """Write a stereo 16-bit PCM WAV file holding a sine tone.
+
+    Args:
+        file_path: Destination file
+        frequency: Tone frequency in Hz
+        seconds: Length of the tone
+    """
+    # One second of audio is generated and repeated
+    samples = array.array("h")
+    for index in range(_SAMPLE_RATE):
+        value = int(8000 * math.sin(2 * math.pi * frequency * index / _SAMPLE_RATE))
+        samples.extend((value,) * _CHANNELS)
+    second = samples.tobytes()
+    temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+    with wave.open(temp_path, "wb") as wav_file:
+        wav_file.setnchannels(_CHANNELS)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(_SAMPLE_RATE)
+        for _ in range(seconds):
+            wav_file.writeframes(second)
+    os.replace(temp_path, file_path)
+
+#endregion
+
+
+#region Provider Class
+
+
+class LocalProvider(SourceProvider):
+    """Songs generated on the fly and served by a local HTTP server.
+
+    Every query resolves to a deterministic ID and a sine tone of fixed
+    length. Each search, metadata lookup, stream resolution and HTTP request
+    waits for the configured latency first, so the pipeline can be timed
+    without the network.
+
+    Attributes:
+        directory: Directory holding the generated files.
+        latency_seconds: Simulated latency of every operation.
+        track_seconds: Length of the generated tracks.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str, latency_seconds: float, track_seconds: int):
+        """Initialize the provider. The HTTP server starts on first use.
+
+        Args:
+            directory: Directory holding the generated files.
+            latency_seconds: Simulated latency of every operation.
+            track_seconds: Length of the generated tracks.
+        """
+        self.directory = directory
+        self.latency_seconds = latency_seconds
+        self.track_seconds = track_seconds
+        self._titles: Dict[str, str] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_id(query: str) -> str:
+        """Get the song ID a query resolves to.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            Deterministic song ID
+        """
+        return "local-" + hashlib.sha1(query.casefold().encode("utf-8")).hexdigest()[:11]
+
+    async def search(self, query: str) -> Optional[Dict[str, Any]]:
+        """Resolve a query to a generated song.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys
+        """
+        await asyncio.sleep(self.latency_seconds)
+        video_id = self.make_id(query)
+        self._titles[video_id] = query
+        return self._metadata(video_id)
+
+    async def get_metadata(self, video_id: str) -> Dict[str, Any]:
+        """Get the metadata of a generated song.
+
+        Args:
+            video_id: Song ID
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys
+        """
+        await asyncio.sleep(self.latency_seconds)
+        return self._metadata(video_id)
+
+    def resolve_streams(self, video_id: str) -> List[StreamInfo]:
+        """Generate the song if needed and get its local stream. Blocking.
+
+        Args:
+            video_id: Song ID
+
+        Returns:
+            The single WAV stream of the song
+        """
+        time.sleep(self.latency_seconds)
+        file_name = f"{video_id}.wav"
+        file_path = os.path.join(self.directory, file_name)
+        if not os.path.exists(file_path):
+            os.makedirs(self.directory, exist_ok=True)
+            frequency = 220 + int(video_id[-4:], 16) % 660
+            _generate_tone(file_path, frequency, self.track_seconds)
+        port = self._ensure_server()
+        expire = int(time.time()) + _URL_LIFETIME_SECONDS
+        bitrate_kbps = _SAMPLE_RATE * _CHANNELS * 16 // 1000
+        return [StreamInfo(
+            _ITAG, f"http://127.0.0.1:{port}/{file_name}?expire={expire}",
+            "wav", "pcm_s16le", f"{bitrate_kbps}kbps", os.path.getsize(file_path),
+        )]
+
+    def close(self) -> None:
+        """Stop the HTTP server if it was started."""
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+    def _metadata(self, video_id: str) -> Dict[str, Any]:
+        """Build the metadata record of a generated song."""
+        return {
+            "id": video_id,
+            "title": self._titles.get(video_id, f"Local track {video_id}"),
+            "duration": self.track_seconds,
+            "thumbnail": None,
+        }
+
+    def _ensure_server(self) -> int:
+        """Start the HTTP server on first use.
+
+        Returns:
+            Port the server listens on
+        """
+        with self._lock:
+            if self._server is None:
+                handler = type("Handler", (_RangeRequestHandler,), {"provider": self})
+                self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="local-source", daemon=True).start()
+                logger.info("Local source serving %s on port %d", self.directory, self._server.server_port)
+            return self._server.server_port
+
+#endregion
+
+
+#region Request Handler
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves generated files, with single byte-range support."""
+
+    provider: LocalProvider
+
+    def do_HEAD(self) -> None:
+        """Answer a HEAD request."""
+        self._serve(send_body=False)
+
+    def do_GET(self) -> None:
+        """Answer a GET request, honouring a Range header."""
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool) -> None:
+        """Send the requested file, or the requested range of it."""
+        time.sleep(self.provider.latency_seconds)
+        file_name = os.path.basename(self.path.split("?", 1)[0])
+        file_path = os.path.join(self.provider.directory, file_name)
+        if not file_name or not os.path.isfile(file_path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(file_path)
+        start, end = 0, size - 1
+        match = _RANGE_PATTERN.match(self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start > end:
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not send_body:
+            return
+        with open(file_path, "rb") as media_file:
+            media_file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = media_file.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Route request logs to the module logger at debug level."""
+        logger.debug(format, *args)
+
+#endregion
@@ -0,0 +1,71 @@
+"""YouTube source provider - YouTube Data API search and pytube stream resolution."""
+
+#region Imports
+
+import logging
+from typing import Any, Dict, List, Optional
+import pytubefix as pytube
+from ..stream_cache import StreamInfo
+from ..helpers.youtube import get_youtube_song, get_video_metadata
+from .base import SourceProvider
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Provider Class
+
+
+class YouTubeProvider(SourceProvider):
+    """Songs from YouTube, searched through the Data API and streamed with pytube."""
+
+    name = "youtube"
+
+    async def search(self, query: str) -> Optional[Dict[str, Any]]:
+        """Search YouTube for a song and get its metadata.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys,
+            or None if not found
+        """
+        return await get_youtube_song(query)
+
+    async def get_metadata(self, video_id: str) -> Dict[str, Any]:
+        """Get the title, duration and thumbnail of a YouTube video.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys;
+            'title' is None if it could not be retrieved
+        """
+        return await get_video_metadata(video_id)
+
+    def resolve_streams(self, video_id: str) -> List[StreamInfo]:
+        """Resolve the audio-only streams of a YouTube video with pytube.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Descriptors of the streams that could be resolved
+        """
+        streams = []
+        for stream in pytube.YouTube(f"https://www.youtube.com/watch?v={video_id}").streams.filter(only_audio=True):
+            try:
+                streams.append(StreamInfo.from_pytube(stream))
+            except Exception:
+                logger.warning("Could not resolve itag %s of video %s", stream.itag, video_id, exc_info=True)
+        return streams
+
+#endregion
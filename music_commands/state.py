@@ -1,12 +1,25 @@
-"""Music state management - Centralized state class for music playback."""
+"""Music state management - Per-guild session state for music playback."""
 
 #region Imports
 
 import os
 import time
 import atexit
-from typing import Optional, Dict, List
+import asyncio
+import logging
+from typing import Optional, Dict, Iterator
 import discord
+from shared.config import BotConfig
+from .cache import audio_cache
+from .queue import Track, TrackQueue
+from .snapshots import QueueSnapshotStore, queue_snapshots
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
 
 #endregion
 
@@ -15,53 +28,296 @@ import discord
 
 
 class MusicState:
-    """Centralized state management for music playback.
-    
+    """Music playback state for a single guild.
+
     Attributes:
+        guild_id: ID of the guild this session belongs to.
         voice_client: Current voice client connection.
         filename: Path to currently downloaded audio file.
+        stream_url: Audio URL of the current song when it is streamed instead of downloaded.
         playlist: Queue of songs to play.
-        last_play_channels: Map of guild IDs to last play command channels.
+        last_play_channel: Text channel where the last play command was used.
         current_song: Currently playing song metadata.
+        restart_requested: Set by /restart so the playback loop replays the current song.
+        loop_running: Whether the playback loop runs or a /play is searching before starting it.
+        download_lock: Serializes downloads for this guild.
+        prefetch_task: Background download of the next queued track.
+        prefetch_video_id: Video ID the prefetch task is downloading.
+        prefetch_taken: Set when the playback loop takes the prefetch, ending its wait to pre-warm.
+        song_started_at: Monotonic time the current song started playing, or None.
+        last_active: Monotonic timestamp of the last command or playback event.
+        idle_task: Pending disconnect while the bot idles in voice after the queue ran out.
+        snapshots: Store the current song and queue are saved to on every change, if any.
     """
-    
-    def __init__(self):
-        """Initialize empty music state."""
+
+    def __init__(self, guild_id: Optional[int] = None, snapshots: Optional[QueueSnapshotStore] = None):
+        """Initialize empty music state.
+
+        Args:
+            guild_id: ID of the guild owning this session.
+            snapshots: Store to save the current song and queue to.
+        """
+        self.guild_id = guild_id
+        self.snapshots = snapshots
         self.voice_client: Optional[discord.VoiceClient] = None
         self.filename: Optional[str] = None
-        self.playlist: List[Dict[str, str]] = []
-        self.last_play_channels: Dict[int, discord.TextChannel] = {}
-        self.current_song: Optional[Dict[str, str]] = None
-    
+        self.stream_url: Optional[str] = None
+        self.playlist = TrackQueue(on_change=self._save_snapshot)
+        self.last_play_channel: Optional[discord.TextChannel] = None
+        self._current_song: Optional[Track] = None
+        self.restart_requested = False
+        self.loop_running = False
+        self.download_lock = asyncio.Lock()
+        self.prefetch_task: Optional[asyncio.Task] = None
+        self.prefetch_video_id: Optional[str] = None
+        self.prefetch_taken: Optional[asyncio.Event] = None
+        self.song_started_at: Optional[float] = None
+        self.last_active = time.monotonic()
+        self.idle_task: Optional[asyncio.Task] = None
+
+    @property
+    def current_song(self) -> Optional[Track]:
+        """Currently playing song metadata."""
+        return self._current_song
+
+    @current_song.setter
+    def current_song(self, track: Optional[Track]) -> None:
+        self._current_song = track
+        self._save_snapshot()
+
+    def restore(self) -> None:
+        """Queue the tracks saved in the snapshot store, with the interrupted song first."""
+        if self.snapshots is None or self.guild_id is None:
+            return
+        tracks = self.snapshots.load(self.guild_id)
+        if tracks:
+            self.playlist.extend(tracks)
+            logger.info("Restored %d queued tracks for guild %s", len(tracks), self.guild_id)
+
+    def touch(self) -> None:
+        """Mark the session as recently used."""
+        self.last_active = time.monotonic()
+
+    def cancel_prefetch(self) -> None:
+        """Cancel the background prefetch and release its audio if already prepared."""
+        task = self.prefetch_task
+        self.prefetch_task = None
+        self.prefetch_video_id = None
+        self.prefetch_taken = None
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+            return
+        if not task.cancelled() and task.exception() is None:
+            task.result().release()
+
+    def cancel_idle_disconnect(self) -> None:
+        """Cancel the pending idle disconnect, keeping the voice connection."""
+        task = self.idle_task
+        self.idle_task = None
+        if task is not None and not task.done():
+            task.cancel()
+
+    def is_idle(self, idle_seconds: float, now: Optional[float] = None) -> bool:
+        """Check whether the session can be evicted.
+
+        Args:
+            idle_seconds: Minimum inactivity before a session counts as idle.
+            now: Current monotonic time (defaults to time.monotonic()).
+
+        Returns:
+            True if the session has no connection, no queue and has been inactive long enough.
+        """
+        if self.voice_client is not None and self.voice_client.is_connected():
+            return False
+        if self.playlist or self.download_lock.locked() or self.prefetch_task is not None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.last_active >= idle_seconds
+
     def reset(self) -> None:
         """Reset all state variables to initial values."""
+        self.cancel_prefetch()
+        self.cancel_idle_disconnect()
         self.voice_client = None
         self.filename = None
-        self.playlist = []
+        self.stream_url = None
+        self.playlist = TrackQueue(on_change=self._save_snapshot)
         self.current_song = None
-    
+        self.song_started_at = None
+        self.restart_requested = False
+
+    def suspend(self) -> None:
+        """Reset the session after a disconnect, keeping its saved queue for the next session."""
+        if self.snapshots is not None:
+            self.snapshots.flush()
+            self.snapshots = None
+        self.reset()
+
+    def _save_snapshot(self) -> None:
+        """Schedule a snapshot of the current song and queue."""
+        if self.snapshots is not None:
+            self.snapshots.mark_dirty(self)
+
     def delete_file_on_exit(self) -> None:
-        """Delete the last downloaded audio file on shutdown."""
+        """Delete the last downloaded audio file on shutdown unless the audio cache keeps it."""
+        if audio_cache.owns(self.filename):
+            return
         if self.filename and os.path.exists(self.filename):
             time.sleep(1)
             os.remove(self.filename)
 
 
-# Global singleton instance - import this in other modules
-state = MusicState()
+#endregion
+
+
+#region Registry Class
+
+
+class MusicStateRegistry:
+    """Registry of per-guild music sessions.
+
+    Sessions are created lazily on first lookup and evicted once idle, so
+    memory grows with the number of guilds actively using music rather than
+    the number of guilds the bot is in.
+
+    Attributes:
+        idle_seconds: Inactivity period after which an idle session is evicted.
+        sweep_interval_seconds: Minimum delay between two eviction sweeps.
+        snapshots: Store sessions save their queue to and are restored from, if any.
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float = BotConfig.MUSIC_SESSION_IDLE_SECONDS,
+        sweep_interval_seconds: float = BotConfig.MUSIC_SESSION_SWEEP_SECONDS,
+        snapshots: Optional[QueueSnapshotStore] = None,
+    ):
+        """Initialize an empty registry.
+
+        Args:
+            idle_seconds: Inactivity period after which an idle session is evicted.
+            sweep_interval_seconds: Minimum delay between two eviction sweeps.
+            snapshots: Store sessions save their queue to and are restored from.
+        """
+        self.idle_seconds = idle_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.snapshots = snapshots
+        self._sessions: Dict[int, MusicState] = {}
+        self._last_sweep = time.monotonic()
+
+    def get(self, guild_id: int) -> MusicState:
+        """Get the session for a guild, creating it if needed.
+
+        A new session starts with the queue saved by the previous one, if any.
+
+        Args:
+            guild_id: Discord guild ID.
+
+        Returns:
+            The guild's music session.
+        """
+        self._maybe_sweep()
+        session = self._sessions.get(guild_id)
+        if session is None:
+            session = MusicState(guild_id, self.snapshots)
+            session.restore()
+            self._sessions[guild_id] = session
+        session.touch()
+        return session
+
+    def peek(self, guild_id: int) -> Optional[MusicState]:
+        """Get the session for a guild without creating one.
+
+        Args:
+            guild_id: Discord guild ID.
+
+        Returns:
+            The guild's music session, or None if it has none.
+        """
+        return self._sessions.get(guild_id)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop every idle session.
+
+        Args:
+            now: Current monotonic time (defaults to time.monotonic()).
+
+        Returns:
+            Number of sessions evicted.
+        """
+        now = time.monotonic() if now is None else now
+        idle = [
+            guild_id for guild_id, session in self._sessions.items()
+            if session.is_idle(self.idle_seconds, now)
+        ]
+        for guild_id in idle:
+            del self._sessions[guild_id]
+        self._last_sweep = now
+        return len(idle)
+
+    def _maybe_sweep(self) -> None:
+        """Run an eviction sweep if the sweep interval has elapsed."""
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval_seconds:
+            self.evict_idle(now)
+
+    def suspend(self, guild_id: int) -> None:
+        """Drop a guild's session after a disconnect, keeping its saved queue.
+
+        Args:
+            guild_id: Discord guild ID.
+        """
+        session = self._sessions.pop(guild_id, None)
+        if session is not None:
+            session.suspend()
+
+    def reset_all(self) -> None:
+        """Reset every session."""
+        for session in self._sessions.values():
+            session.reset()
+
+    def delete_files_on_exit(self) -> None:
+        """Delete the downloaded audio files of every session on shutdown."""
+        for session in self._sessions.values():
+            session.delete_file_on_exit()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[MusicState]:
+        return iter(list(self._sessions.values()))
+
+
+# Global registry instance - import this in other modules
+sessions = MusicStateRegistry(snapshots=queue_snapshots if BotConfig.MUSIC_QUEUE_SNAPSHOTS else None)
 
 # Register cleanup on exit
-atexit.register(state.delete_file_on_exit)
+atexit.register(sessions.delete_files_on_exit)
+atexit.register(queue_snapshots.flush)
+
+
+def get_state(guild_id: int) -> MusicState:
+    """Get the music session for a guild, creating it if needed.
+
+    Args:
+        guild_id: Discord guild ID.
+
+    Returns:
+        The guild's music session.
+    """
+    return sessions.get(guild_id)
 
 
 # Backwards compatibility functions
 def reset_state() -> None:
-    """Reset all global state variables."""
-    state.reset()
+    """Reset the state of every guild session."""
+    sessions.reset_all()
 
 
 def delete_file_on_exit() -> None:
-    """Delete the last downloaded audio file on shutdown."""
-    state.delete_file_on_exit()
+    """Delete the downloaded audio files on shutdown."""
+    sessions.delete_files_on_exit()
 
 #endregion
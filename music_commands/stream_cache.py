@@ -0,0 +1,196 @@
+"""Stream cache - Resolved YouTube audio stream descriptors, kept until their URLs expire."""
+
+#region Imports
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from shared.config import BotConfig
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Stream Class
+
+
+class StreamInfo:
+    """Resolved audio stream of a video, detached from pytube.
+
+    Attributes:
+        itag: YouTube stream itag.
+        url: Signed media URL.
+        subtype: Container extension, such as "webm".
+        audio_codec: Audio codec, such as "opus".
+        abr: Audio bitrate as reported by YouTube, such as "160kbps".
+        filesize: Size of the media in bytes.
+        expires: Unix time the URL stops working, or None if unknown.
+    """
+
+    __slots__ = ("itag", "url", "subtype", "audio_codec", "abr", "filesize", "expires")
+
+    def __init__(self, itag: int, url: str, subtype: str, audio_codec: Optional[str], abr: Optional[str], filesize: int):
+        """Initialize the descriptor.
+
+        Args:
+            itag: YouTube stream itag.
+            url: Signed media URL.
+            subtype: Container extension.
+            audio_codec: Audio codec.
+            abr: Audio bitrate string.
+            filesize: Size of the media in bytes.
+        """
+        self.itag = itag
+        self.url = url
+        self.subtype = subtype
+        self.audio_codec = audio_codec
+        self.abr = abr
+        self.filesize = filesize
+        self.expires = _get_expiry(url)
+
+    @classmethod
+    def from_pytube(cls, stream) -> "StreamInfo":
+        """Copy the fields needed for playback from a pytube stream.
+
+        Reading the URL and size may trigger signature deciphering or a HEAD
+        request, so this should run on a worker thread.
+
+        Args:
+            stream: pytube audio stream.
+
+        Returns:
+            The descriptor.
+        """
+        return cls(stream.itag, stream.url, stream.subtype, stream.audio_codec, stream.abr, stream.filesize)
+
+    def __repr__(self) -> str:
+        return f"StreamInfo(itag={self.itag!r}, audio_codec={self.audio_codec!r}, abr={self.abr!r})"
+
+
+def _get_expiry(url: str) -> Optional[float]:
+    """Read the 'expire' timestamp of a signed YouTube media URL.
+
+    Args:
+        url: Media URL.
+
+    Returns:
+        Unix time of expiry, or None if the URL has none.
+    """
+    values = parse_qs(urlparse(url).query).get("expire")
+    try:
+        return float(values[0]) if values else None
+    except ValueError:
+        return None
+
+#endregion
+
+
+#region Cache Class
+
+
+class StreamCache:
+    """In-memory LRU cache of resolved audio streams per video ID.
+
+    Entries expire a safety margin before the earliest URL expiry of the
+    video, so a cached URL stays valid for the whole song. Descriptors whose
+    URL has no expiry are not cached. Lookups come from executor threads, so
+    access goes through a lock.
+
+    Attributes:
+        max_entries: Maximum number of videos kept.
+        expiry_margin_seconds: How long before URL expiry an entry is dropped.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that were not cached or had expired.
+    """
+
+    def __init__(self, max_entries: int, expiry_margin_seconds: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of videos kept.
+            expiry_margin_seconds: How long before URL expiry an entry is dropped.
+        """
+        self.max_entries = max_entries
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[StreamInfo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[List[StreamInfo]]:
+        """Get the cached audio streams of a video.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            Audio streams, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[video_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(video_id)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, video_id: str, streams: List[StreamInfo]) -> None:
+        """Cache the audio streams of a video until their URLs expire.
+
+        Args:
+            video_id: YouTube video ID.
+            streams: Resolved audio streams.
+        """
+        expiries = [stream.expires for stream in streams]
+        if not streams or None in expiries:
+            return
+        valid_until = min(expiries) - self.expiry_margin_seconds
+        if valid_until <= time.time():
+            return
+        with self._lock:
+            self._entries[video_id] = (valid_until, list(streams))
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_id: str) -> None:
+        """Drop the cached streams of a video, e.g. after an HTTP 403.
+
+        Args:
+            video_id: YouTube video ID.
+        """
+        with self._lock:
+            if self._entries.pop(video_id, None) is not None:
+                logger.info("Invalidated cached streams of video %s", video_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate and entry count.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+# Global cache instance shared by every guild
+stream_cache = StreamCache(BotConfig.MUSIC_STREAM_CACHE_MAX_ENTRIES, BotConfig.MUSIC_STREAM_URL_EXPIRY_MARGIN_SECONDS)
+
+#endregion
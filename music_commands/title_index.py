@@ -0,0 +1,166 @@
+"""Title index - Trigram search over songs already resolved, for slash command autocomplete."""
+
+#region Imports
+
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+from shared.config import BotConfig
+
+#endregion
+
+
+#region Setup
+
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+#endregion
+
+
+#region Functions
+
+
+def _normalize(text: str) -> str:
+    """Casefold text and collapse punctuation into single spaces."""
+    return _NON_WORD_PATTERN.sub(" ", text.casefold()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Get the three-character substrings of a normalized text."""
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+#endregion
+
+
+#region Index Class
+
+
+class TitleIndex:
+    """In-memory index of the titles and video IDs this bot has resolved.
+
+    Entries are found by substring through a trigram index, or by scanning
+    word prefixes for queries shorter than a trigram, and ranked by how
+    often they were played. The least recently used entry is dropped once
+    the index is full.
+
+    Attributes:
+        max_entries: Maximum number of indexed songs.
+    """
+
+    def __init__(self, max_entries: int):
+        """Initialize an empty index.
+
+        Args:
+            max_entries: Maximum number of indexed songs.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys: Dict[str, str] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Index a resolved song, keeping its play count if already known.
+
+        Args:
+            entry: Dictionary with 'id' and 'title' keys and optional 'duration' and 'thumbnail' keys.
+        """
+        video_id, title = entry.get("id"), entry.get("title")
+        if not video_id or not title:
+            return
+        known = self._entries.get(video_id)
+        plays = known["plays"] if known is not None else 0
+        if known is not None:
+            self._unindex(video_id)
+        self._entries[video_id] = {
+            "id": video_id,
+            "title": title,
+            "duration": entry.get("duration"),
+            "thumbnail": entry.get("thumbnail"),
+            "plays": plays,
+        }
+        key = _normalize(f"{title} {video_id}")
+        self._keys[video_id] = key
+        for trigram in _trigrams(key):
+            self._postings.setdefault(trigram, set()).add(video_id)
+        while len(self._entries) > self.max_entries:
+            self._unindex(next(iter(self._entries)))
+
+    def record_play(self, entry: Dict[str, Any]) -> None:
+        """Count a play of a song, indexing it if needed.
+
+        Args:
+            entry: Dictionary with 'id' and 'title' keys and optional 'duration' and 'thumbnail' keys.
+        """
+        self.add(entry)
+        known = self._entries.get(entry.get("id"))
+        if known is not None:
+            known["plays"] += 1
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Get an indexed song.
+
+        Args:
+            video_id: Video ID of the song.
+
+        Returns:
+            Dictionary with 'id', 'title', 'duration' and 'thumbnail' keys,
+            or None if the song is not indexed
+        """
+        known = self._entries.get(video_id)
+        if known is None:
+            return None
+        self._entries.move_to_end(video_id)
+        return {key: known[key] for key in ("id", "title", "duration", "thumbnail")}
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Find indexed songs whose title or video ID contains the query.
+
+        Args:
+            query: Text typed so far.
+            limit: Maximum number of results.
+
+        Returns:
+            Matching entries, most played first, with a 'plays' key.
+        """
+        needle = _normalize(query)
+        if not needle:
+            candidates = list(self._entries)
+        elif len(needle) < 3:
+            candidates = [
+                video_id for video_id, key in self._keys.items()
+                if any(word.startswith(needle) for word in key.split())
+            ]
+        else:
+            postings = sorted((self._postings.get(trigram, set()) for trigram in _trigrams(needle)), key=len)
+            matches = set.intersection(*postings) if postings else set()
+            # Trigrams can all match without the query appearing as a whole
+            candidates = [video_id for video_id in matches if needle in self._keys[video_id]]
+        ranked = sorted(
+            candidates,
+            key=lambda video_id: (
+                -self._entries[video_id]["plays"],
+                not self._keys[video_id].startswith(needle),
+            ),
+        )
+        return [dict(self._entries[video_id]) for video_id in ranked[:limit]]
+
+    def _unindex(self, video_id: str) -> None:
+        """Remove a song from the entries and the trigram postings."""
+        self._entries.pop(video_id, None)
+        key = self._keys.pop(video_id, "")
+        for trigram in _trigrams(key):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                continue
+            posting.discard(video_id)
+            if not posting:
+                del self._postings[trigram]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global index shared by every guild
+title_index = TitleIndex(BotConfig.MUSIC_TITLE_INDEX_MAX_ENTRIES)
+
+#endregion
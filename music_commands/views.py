@@ -0,0 +1,152 @@
+"""Music views - Paginated playlist rendering and navigation buttons."""
+
+#region Imports
+
+from typing import Optional
+import discord
+from .queue import TrackQueue, format_duration
+from .state import MusicState
+
+#endregion
+
+
+#region Setup
+
+PLAYLIST_PAGE_SIZE = 15
+
+# Keeps a full page well under Discord's 2000 character message limit
+_MAX_TITLE_LENGTH = 90
+
+#endregion
+
+
+#region Functions
+
+
+def get_page_count(playlist: TrackQueue) -> int:
+    """Get the number of playlist pages.
+
+    Args:
+        playlist: Queue to display.
+
+    Returns:
+        Number of pages (at least 1).
+    """
+    return max(1, -(-len(playlist) // PLAYLIST_PAGE_SIZE))
+
+
+def render_playlist_page(playlist: TrackQueue, page: int = 0) -> str:
+    """Render one page of the playlist.
+
+    Only the tracks of the requested page are read, so rendering cost does
+    not grow with the queue length.
+
+    Args:
+        playlist: Queue to display.
+        page: 0-based page number, clamped to the valid range.
+
+    Returns:
+        Formatted page that fits in a single Discord message.
+    """
+    if not playlist:
+        return "Playlist is empty."
+    page_count = get_page_count(playlist)
+    page = min(max(page, 0), page_count - 1)
+    start = page * PLAYLIST_PAGE_SIZE
+    total = format_duration(playlist.total_duration)
+    if playlist.unknown_durations:
+        total += "+"
+    lines = [f"New playlist ({len(playlist)} songs, {total}):"]
+    for position, track in enumerate(playlist.page(start, PLAYLIST_PAGE_SIZE), start=start + 1):
+        title = track.title or track.id
+        if len(title) > _MAX_TITLE_LENGTH:
+            title = title[:_MAX_TITLE_LENGTH - 3] + "..."
+        lines.append(f"{position}. {title} [{format_duration(track.duration)}]")
+    if page_count > 1:
+        lines.append(f"Page {page + 1}/{page_count}")
+    return "\n".join(lines)
+
+#endregion
+
+
+#region View Class
+
+
+class PlaylistView(discord.ui.View):
+    """Previous/next buttons for browsing the playlist page by page.
+
+    Pages are rendered from the live queue on every click, so the view
+    always shows the current playlist.
+
+    Attributes:
+        state: Music session whose playlist is displayed.
+        page: 0-based page currently shown.
+        message: Message the view is attached to, set after sending.
+    """
+
+    def __init__(self, state: MusicState, timeout: float = 180):
+        """Initialize the view on the first page.
+
+        Args:
+            state: Music session whose playlist is displayed.
+            timeout: Seconds of inactivity before the buttons are disabled.
+        """
+        super().__init__(timeout=timeout)
+        self.state = state
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self._update_buttons()
+
+    def render(self) -> str:
+        """Render the current page.
+
+        Returns:
+            Formatted page.
+        """
+        return render_playlist_page(self.state.playlist, self.page)
+
+    def _update_buttons(self) -> None:
+        """Enable only the buttons that lead to an existing page."""
+        page_count = get_page_count(self.state.playlist)
+        self.page = min(self.page, page_count - 1)
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= page_count - 1
+
+    async def _show(self, interaction: discord.Interaction) -> None:
+        """Redraw the message for the current page."""
+        self._update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Show the previous page.
+
+        Args:
+            interaction: Discord interaction context.
+            button: Clicked button.
+        """
+        self.page = max(self.page - 1, 0)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Show the next page.
+
+        Args:
+            interaction: Discord interaction context.
+            button: Clicked button.
+        """
+        self.page += 1
+        await self._show(interaction)
+
+    async def on_timeout(self) -> None:
+        """Disable the buttons once the view expires."""
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+#endregion
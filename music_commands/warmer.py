@@ -0,0 +1,137 @@
+"""Cache warmer - Downloads likely tracks into the audio cache while the bot is idle."""
+
+#region Imports
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional, Tuple
+from shared.config import BotConfig
+from .cache import audio_cache
+from .history import PlayHistory, play_history
+from .state import sessions
+from .helpers import download_audio, _is_playing, _is_paused
+
+#endregion
+
+
+#region Setup
+
+logger = logging.getLogger(__name__)
+
+#endregion
+
+
+#region Warmer Class
+
+
+class CacheWarmer:
+    """Low-priority background task that pre-downloads the tracks play history predicts.
+
+    Every interval, if no guild is playing or downloading, the top predicted
+    tracks missing from the audio cache are downloaded one at a time, at the
+    bitrate of the voice channel each was last played in. Warming
+    stops once the cache reaches the disk budget, so it never evicts audio
+    that was actually played. It also stops once the hourly download budget
+    is spent.
+
+    Attributes:
+        history: Play history the predictions come from.
+        interval_seconds: Delay between two warming rounds.
+        top_tracks: Number of predicted tracks kept warm.
+        disk_budget_bytes: Cache size the warmer does not download beyond.
+        bytes_per_hour: Download volume allowed per hour.
+    """
+
+    def __init__(self, history: PlayHistory, interval_seconds: float, top_tracks: int, disk_budget_bytes: int, bytes_per_hour: int):
+        """Initialize a stopped warmer.
+
+        Args:
+            history: Play history the predictions come from.
+            interval_seconds: Delay between two warming rounds.
+            top_tracks: Number of predicted tracks kept warm.
+            disk_budget_bytes: Cache size the warmer does not download beyond.
+            bytes_per_hour: Download volume allowed per hour.
+        """
+        self.history = history
+        self.interval_seconds = interval_seconds
+        self.top_tracks = top_tracks
+        self.disk_budget_bytes = disk_budget_bytes
+        self.bytes_per_hour = bytes_per_hour
+        self._downloads: Deque[Tuple[float, int]] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start warming in the background of the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop warming, cancelling a download in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def warm_once(self) -> int:
+        """Run one warming round.
+
+        Returns:
+            Number of tracks downloaded
+        """
+        warmed = 0
+        for video_id in self.history.predict(self.top_tracks):
+            if not self._is_idle() or self._over_budget():
+                break
+            if audio_cache.contains(video_id):
+                continue
+            try:
+                # Plays are served from the cache whatever its bitrate, so warm at the one they will need
+                file_path = await download_audio(video_id, self.history.last_bitrate(video_id))
+            except Exception:
+                logger.warning("Could not warm video %s", video_id, exc_info=True)
+                continue
+            self._downloads.append((time.monotonic(), os.path.getsize(file_path)))
+            audio_cache.unpin(file_path)
+            warmed += 1
+        if warmed:
+            logger.info("Warmed %d predicted tracks into the audio cache", warmed)
+        return warmed
+
+    async def _run(self) -> None:
+        """Warm the cache every interval until stopped."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.warm_once()
+            except Exception:
+                logger.exception("Cache warming round failed")
+
+    def _is_idle(self) -> bool:
+        """Check that no guild is playing, paused or downloading."""
+        return not any(
+            _is_playing(state) or _is_paused(state) or state.download_lock.locked() or state.prefetch_task is not None
+            for state in sessions
+        )
+
+    def _over_budget(self) -> bool:
+        """Check the disk budget and the download volume of the last hour."""
+        if audio_cache.stats()["bytes"] >= self.disk_budget_bytes:
+            return True
+        cutoff = time.monotonic() - 3600
+        while self._downloads and self._downloads[0][0] < cutoff:
+            self._downloads.popleft()
+        return sum(size for _, size in self._downloads) >= self.bytes_per_hour
+
+
+# Global warmer, started by the music cog
+cache_warmer = CacheWarmer(
+    play_history,
+    BotConfig.MUSIC_WARMER_INTERVAL_SECONDS,
+    BotConfig.MUSIC_WARMER_TOP_TRACKS,
+    BotConfig.MUSIC_WARMER_DISK_BUDGET_BYTES,
+    BotConfig.MUSIC_WARMER_BYTES_PER_HOUR,
+)
+
+#endregion
@@ -23,6 +23,62 @@ class BotConfig:
         QUESTION_COOLDOWN_PER_SECONDS: Question cooldown window in seconds.
         MUSIC_COOLDOWN_RATE: Max music requests per window.
         MUSIC_COOLDOWN_PER_SECONDS: Music cooldown window in seconds.
+        MUSIC_SESSION_IDLE_SECONDS: Inactivity before an idle guild music session is evicted.
+        MUSIC_SESSION_SWEEP_SECONDS: Minimum delay between idle session sweeps.
+        MUSIC_IDLE_GRACE_SECONDS: How long the bot stays in voice after the playlist runs out (0 leaves at once).
+        MUSIC_PREBUFFER_SECONDS: Audio of the next track buffered ahead of its turn (0 disables pre-warming).
+        MUSIC_PREWARM_LEAD_SECONDS: How long before the current track ends the next one is pre-warmed.
+        MUSIC_STREAMING_ENABLED: Stream audio URLs straight to FFmpeg instead of downloading files first.
+        MUSIC_STREAM_RECONNECT_DELAY_MAX_SECONDS: Max FFmpeg reconnect delay while streaming.
+        MUSIC_OPUS_PASSTHROUGH: Prefer Opus streams and let FFmpeg output Opus (copying it when possible).
+        MUSIC_STREAM_SELECTION: Audio stream policy: "smallest_above" the voice channel bitrate, "highest" or "first".
+        MUSIC_STREAM_MIN_BITRATE: Lowest target bitrate in bits per second for stream selection.
+        MUSIC_BROADCAST_ENABLED: Share one Opus decoder between guilds playing the same track.
+        MUSIC_BROADCAST_BUFFER_SECONDS: Audio a shared broadcast keeps after playing it; guilds may join it until its leading guild has played about this long.
+        MUSIC_SEARCH_WORKERS: Threads for YouTube API calls and title lookups.
+        MUSIC_RESOLVE_WORKERS: Threads for audio stream resolution.
+        MUSIC_DOWNLOAD_WORKERS: Threads for audio downloads.
+        MUSIC_LOUDNESS_NORMALIZATION: Analyze cached audio loudness and apply a static gain to audio FFmpeg decodes; copied Opus is not normalized.
+        MUSIC_LOUDNESS_TARGET_LUFS: Integrated loudness tracks are normalized to.
+        MUSIC_LOUDNESS_TRUE_PEAK_DB: True peak ceiling that limits boosts.
+        MUSIC_LOUDNESS_MAX_BOOST_DB: Largest gain applied to quiet tracks.
+        MUSIC_LOUDNESS_MIN_GAIN_DB: Smallest gain worth applying.
+        MUSIC_LOUDNESS_WORKERS: Concurrent background loudness analyses.
+        MUSIC_LOUDNESS_ANALYSIS_TIMEOUT_SECONDS: Time limit of one loudness analysis.
+        MUSIC_SOURCE_PROVIDER: Backend songs come from: "youtube", or "local" for offline benchmarks.
+        MUSIC_LOCAL_SOURCE_LATENCY_SECONDS: Simulated latency of every local source operation.
+        MUSIC_LOCAL_SOURCE_TRACK_SECONDS: Length of the tracks generated by the local source.
+        MUSIC_STREAM_CACHE_MAX_ENTRIES: Maximum videos whose resolved stream URLs are cached.
+        MUSIC_STREAM_URL_EXPIRY_MARGIN_SECONDS: How long before a stream URL expires it stops being reused.
+        MUSIC_DOWNLOAD_CONNECTIONS: Concurrent range requests per audio download.
+        MUSIC_DOWNLOAD_SEGMENT_BYTES: Size of each downloaded byte range.
+        MUSIC_DOWNLOAD_SEGMENT_RETRIES: Retries of a failed byte range, resuming where it stopped.
+        MUSIC_DOWNLOAD_SEGMENT_TIMEOUT_SECONDS: Socket timeout of a single range request.
+        AUDIO_CACHE_MAX_BYTES: Disk budget of the downloaded audio cache in bytes.
+        YOUTUBE_SEARCH_CACHE_TTL_SECONDS: Lifetime of a cached search result in seconds.
+        YOUTUBE_SEARCH_CACHE_MAX_ENTRIES: Maximum number of cached search results.
+        YOUTUBE_SEARCH_CACHE_PERSIST: Keep cached search results across restarts.
+        YOUTUBE_METADATA_BATCH_WINDOW_SECONDS: Delay for coalescing video metadata lookups into one request.
+        MUSIC_QUEUE_MAX_QUERIES: Maximum songs accepted by one multi-song /queue.
+        MUSIC_QUEUE_CONCURRENCY: Songs of a multi-song /queue resolved at the same time.
+        MUSIC_TITLE_INDEX_MAX_ENTRIES: Maximum resolved songs kept for /play and /queue autocomplete.
+        MUSIC_AUTOCOMPLETE_RESULTS: Suggestions shown by song autocomplete (at most 25).
+        MUSIC_QUEUE_SNAPSHOTS: Save each guild's queue so it survives restarts and gateway drops.
+        MUSIC_QUEUE_SNAPSHOT_DELAY_SECONDS: Delay coalescing queue changes into one snapshot write.
+        MUSIC_HISTORY_MAX_ENTRIES: Plays kept in the play history log.
+        MUSIC_HISTORY_HALF_LIFE_SECONDS: Time for a past play to lose half its weight in predictions.
+        MUSIC_WARMER_ENABLED: Pre-download tracks predicted from play history while the bot is idle.
+        MUSIC_WARMER_INTERVAL_SECONDS: Delay between two cache warming rounds.
+        MUSIC_WARMER_TOP_TRACKS: Number of predicted tracks kept in the audio cache.
+        MUSIC_WARMER_DISK_BUDGET_BYTES: Audio cache size the warmer does not download beyond.
+        MUSIC_WARMER_BYTES_PER_HOUR: Download volume the warmer may use per hour.
+        YOUTUBE_DAILY_QUOTA_UNITS: Daily YouTube Data API quota of the project, in units.
+        YOUTUBE_QUOTA_SEARCH_RESERVE_UNITS: Remaining units below which searches are scraped instead of using the API.
+        YOUTUBE_QUOTA_BURST_UNITS: Search units the quota token bucket can spend at once.
+        YOUTUBE_QUOTA_REFILL_UNITS_PER_HOUR: Rate the search token bucket refills at.
+        YOUTUBE_QUOTA_TIMEZONE: Timezone whose midnight resets the daily quota.
+        YOUTUBE_PLAYLIST_MAX_TRACKS: Maximum number of videos imported from one playlist.
+        YOUTUBE_PLAYLIST_CONCURRENCY: Maximum playlist pages resolved at the same time.
     """
 
     # Timeouts (seconds)
@@ -37,4 +93,92 @@ class BotConfig:
     MUSIC_COOLDOWN_RATE: int = 2
     MUSIC_COOLDOWN_PER_SECONDS: int = 10
 
+    # Music sessions (seconds)
+    MUSIC_SESSION_IDLE_SECONDS: int = 1800
+    MUSIC_SESSION_SWEEP_SECONDS: int = 60
+    MUSIC_IDLE_GRACE_SECONDS: int = 120
+
+    # Music playback
+    MUSIC_PREBUFFER_SECONDS: float = 3.0
+    MUSIC_PREWARM_LEAD_SECONDS: float = 10.0
+    MUSIC_STREAMING_ENABLED: bool = False
+    MUSIC_STREAM_RECONNECT_DELAY_MAX_SECONDS: int = 5
+    MUSIC_OPUS_PASSTHROUGH: bool = True
+    MUSIC_STREAM_SELECTION: str = "smallest_above"
+    MUSIC_STREAM_MIN_BITRATE: int = 48000
+
+    # Shared broadcasts
+    MUSIC_BROADCAST_ENABLED: bool = False
+    MUSIC_BROADCAST_BUFFER_SECONDS: float = 30.0
+
+    # Music worker threads
+    MUSIC_SEARCH_WORKERS: int = 4
+    MUSIC_RESOLVE_WORKERS: int = 4
+    MUSIC_DOWNLOAD_WORKERS: int = 2
+
+    # Loudness normalization
+    MUSIC_LOUDNESS_NORMALIZATION: bool = True
+    MUSIC_LOUDNESS_TARGET_LUFS: float = -14.0
+    MUSIC_LOUDNESS_TRUE_PEAK_DB: float = -1.0
+    MUSIC_LOUDNESS_MAX_BOOST_DB: float = 10.0
+    MUSIC_LOUDNESS_MIN_GAIN_DB: float = 1.0
+    MUSIC_LOUDNESS_WORKERS: int = 1
+    MUSIC_LOUDNESS_ANALYSIS_TIMEOUT_SECONDS: int = 120
+
+    # Music source
+    MUSIC_SOURCE_PROVIDER: str = "youtube"
+    MUSIC_LOCAL_SOURCE_LATENCY_SECONDS: float = 0.05
+    MUSIC_LOCAL_SOURCE_TRACK_SECONDS: int = 30
+
+    # Resolved stream URLs
+    MUSIC_STREAM_CACHE_MAX_ENTRIES: int = 500
+    MUSIC_STREAM_URL_EXPIRY_MARGIN_SECONDS: int = 30 * 60
+
+    # Segmented downloads
+    MUSIC_DOWNLOAD_CONNECTIONS: int = 4
+    MUSIC_DOWNLOAD_SEGMENT_BYTES: int = 2 * 1024 ** 2
+    MUSIC_DOWNLOAD_SEGMENT_RETRIES: int = 3
+    MUSIC_DOWNLOAD_SEGMENT_TIMEOUT_SECONDS: int = 10
+
+    # Audio cache
+    AUDIO_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+
+    # YouTube search cache
+    YOUTUBE_SEARCH_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    YOUTUBE_SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    YOUTUBE_SEARCH_CACHE_PERSIST: bool = True
+    YOUTUBE_METADATA_BATCH_WINDOW_SECONDS: float = 0.05
+
+    # Multi-song queueing
+    MUSIC_QUEUE_MAX_QUERIES: int = 25
+    MUSIC_QUEUE_CONCURRENCY: int = 4
+
+    # Song autocomplete
+    MUSIC_TITLE_INDEX_MAX_ENTRIES: int = 5000
+    MUSIC_AUTOCOMPLETE_RESULTS: int = 10
+
+    # Queue snapshots
+    MUSIC_QUEUE_SNAPSHOTS: bool = True
+    MUSIC_QUEUE_SNAPSHOT_DELAY_SECONDS: float = 1.0
+
+    # Play history and cache warming
+    MUSIC_HISTORY_MAX_ENTRIES: int = 20000
+    MUSIC_HISTORY_HALF_LIFE_SECONDS: int = 7 * 24 * 60 * 60
+    MUSIC_WARMER_ENABLED: bool = True
+    MUSIC_WARMER_INTERVAL_SECONDS: int = 10 * 60
+    MUSIC_WARMER_TOP_TRACKS: int = 20
+    MUSIC_WARMER_DISK_BUDGET_BYTES: int = 1024 ** 3
+    MUSIC_WARMER_BYTES_PER_HOUR: int = 200 * 1024 ** 2
+
+    # YouTube API quota
+    YOUTUBE_DAILY_QUOTA_UNITS: int = 10000
+    YOUTUBE_QUOTA_SEARCH_RESERVE_UNITS: int = 1000
+    YOUTUBE_QUOTA_BURST_UNITS: int = 2000
+    YOUTUBE_QUOTA_REFILL_UNITS_PER_HOUR: float = 1000
+    YOUTUBE_QUOTA_TIMEZONE: str = "America/Los_Angeles"
+
+    # YouTube playlist import
+    YOUTUBE_PLAYLIST_MAX_TRACKS: int = 500
+    YOUTUBE_PLAYLIST_CONCURRENCY: int = 4
+
 #endregion